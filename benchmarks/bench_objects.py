@@ -0,0 +1,263 @@
+"""
+Objects/sec and memory per object of the hot paths left once the network is cached.
+
+Covers building `Machine`, `Challenge`, `User`, `Team`, `MachineSolve` and `Leaderboard`
+objects from API data, reading attributes back from them, `parse_delta`, date parsing
+with `dateutil` and `parse_datetime`, and rendering the machine note template. The API
+data comes from `mock_htb`, served through Flask's test client so nothing is sent over
+the network.
+
+Memory is measured with `tracemalloc` while the results are kept alive: ``kept`` is what
+each object retains, ``peak`` adds the garbage created while building it.
+
+Each object row is measured twice: once with the `__slots__` classes of the package, and
+once with copies of the same classes that keep their attributes in a per-instance
+``__dict__`` instead, as every object did before. ``--no-compare`` skips the copies.
+
+Usage::
+
+    python benchmarks/bench_objects.py --machines 500 --repeat 5
+
+"""
+
+import argparse
+import os
+import sys
+import timeit
+import tracemalloc
+import types
+
+import dateutil.parser
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from hackthebox import (  # noqa: E402
+    HTBClient,
+    Challenge,
+    Machine,
+    MachineSolve,
+    Team,
+    User,
+)
+from hackthebox.leaderboard import Leaderboard  # noqa: E402
+from hackthebox.utils import parse_datetime, parse_delta  # noqa: E402
+from mock_htb import Catalog, create_app  # noqa: E402
+from templates_md import get_machine_template  # noqa: E402
+
+
+def fetch(app, endpoint, key):
+    response = app.get("/api/v4/" + endpoint, headers={"Authorization": "Bearer x"})
+    return response.get_json()[key]
+
+
+_twins = {}
+
+
+def _rebind(value, twin):
+    """Point a function (or property) at `twin` and the other copies made so far
+
+    Its zero-argument `super()` is bound to `twin`, and module globals naming a copied
+    class name the copy, so e.g. a `Leaderboard` copy builds `User` copies.
+    """
+    if isinstance(value, property):
+        return property(
+            *(_rebind(f, twin) for f in (value.fget, value.fset, value.fdel)),
+            value.__doc__,
+        )
+    if isinstance(value, (staticmethod, classmethod)):
+        return type(value)(_rebind(value.__func__, twin))
+    if not isinstance(value, types.FunctionType):
+        return value
+    closure = value.__closure__ and tuple(
+        types.CellType(twin) if name == "__class__" else cell
+        for name, cell in zip(value.__code__.co_freevars, value.__closure__)
+    )
+    namespace = dict(value.__globals__)
+    namespace.update(
+        (name, _twins[obj])
+        for name, obj in value.__globals__.items()
+        if isinstance(obj, type) and obj in _twins
+    )
+    rebound = types.FunctionType(
+        value.__code__, namespace, value.__name__, value.__defaults__, closure
+    )
+    rebound.__kwdefaults__ = value.__kwdefaults__
+    return rebound
+
+
+def dict_backed(cls):
+    """A copy of `cls` and its bases that stores attributes in a per-instance __dict__
+
+    Copy the classes an object builds before the object itself.
+    """
+    if cls is object:
+        return object
+    if cls not in _twins:
+        bases = tuple(dict_backed(base) for base in cls.__bases__)
+        namespace = {
+            name: value
+            for name, value in vars(cls).items()
+            if name not in ("__slots__", "__dict__", "__weakref__")
+            and not isinstance(value, types.MemberDescriptorType)
+        }
+        twin = type(cls.__name__, bases, namespace)
+        for name, value in namespace.items():
+            setattr(twin, name, _rebind(value, twin))
+        _twins[cls] = twin
+    return _twins[cls]
+
+
+def measure(label, func, inputs, repeat):
+    """Time `func` over every input and print objects/sec and memory per object"""
+
+    def build():
+        return [func(item) for item in inputs]
+
+    best = min(timeit.repeat(build, number=1, repeat=repeat))
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    results = build()
+    kept, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del results
+    count = len(inputs)
+    print(
+        f"{label:<36} {count / best:12.0f} obj/s "
+        f"{(kept - before) / count:10.0f} B kept/obj "
+        f"{(peak - before) / count:10.0f} B peak/obj"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--machines", type=int, default=500)
+    parser.add_argument("--challenges", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--no-compare",
+        action="store_true",
+        help="Skip measuring the objects without __slots__",
+    )
+    args = parser.parse_args()
+
+    catalog = Catalog(machines=args.machines, challenges=args.challenges)
+    app = create_app(catalog).test_client()
+    client = HTBClient(app_token="benchmark", api_base="http://127.0.0.1:9/api/v4/")
+
+    profiles = list(catalog.machines.values())
+    summaries = fetch(app, "machine/list/retired", "info") + fetch(
+        app, "machine/list", "info"
+    )
+    challenges = list(catalog.challenges.values())
+    rankings = fetch(app, "rankings/users", "data")
+    users = list(catalog.users.values())
+    teams = list(catalog.teams.values()) * max(1, args.machines // len(catalog.teams))
+    solves = [
+        {
+            "date": parse_datetime(m["release"]),
+            "first_blood": False,
+            "id": m["id"],
+            "name": m["name"],
+            "type": "user",
+        }
+        for m in profiles
+    ]
+    deltas = [
+        m["authUserFirstUserTime"] for m in profiles if m["authUserFirstUserTime"]
+    ]
+    dates = [m["release"] for m in profiles]
+    notes = [
+        (
+            Machine(m, client),
+            catalog.matrices[m["id"]],
+            catalog.difficulties[m["id"]],
+            catalog.tags[m["id"]],
+        )
+        for m in profiles
+    ]
+
+    variants = [("", (Machine, Challenge, User, Team, MachineSolve, Leaderboard))]
+    if not args.no_compare:
+        variants.append(
+            (
+                " [__dict__]",
+                tuple(
+                    dict_backed(cls)
+                    for cls in (
+                        Machine,
+                        Challenge,
+                        User,
+                        Team,
+                        MachineSolve,
+                        Leaderboard,
+                    )
+                ),
+            )
+        )
+    for suffix, classes in variants:
+        machine, challenge, user, team, solve, leaderboard = classes
+        measure(
+            "Machine (full)" + suffix,
+            lambda d: machine(d, client),
+            profiles,
+            args.repeat,
+        )
+        measure(
+            "Machine (summary)" + suffix,
+            lambda d: machine(d, client, summary=True),
+            summaries,
+            args.repeat,
+        )
+        measure(
+            "Challenge (full)" + suffix,
+            lambda d: challenge(d, client),
+            challenges,
+            args.repeat,
+        )
+        measure(
+            "Challenge (summary)" + suffix,
+            lambda d: challenge(d, client, summary=True),
+            challenges,
+            args.repeat,
+        )
+        measure("User (full)" + suffix, lambda d: user(d, client), users, args.repeat)
+        measure("Team (full)" + suffix, lambda d: team(d, client), teams, args.repeat)
+        measure(
+            "MachineSolve" + suffix, lambda d: solve(d, client), solves, args.repeat
+        )
+        measure(
+            "Machine attribute reads" + suffix,
+            lambda m: (
+                m.name,
+                m.points,
+                m.stars,
+                m.difficulty,
+                m.retired,
+                m.user_owned,
+            ),
+            [machine(d, client) for d in profiles],
+            args.repeat,
+        )
+        measure(
+            f"Leaderboard ({len(rankings)} users)" + suffix,
+            lambda d: leaderboard(d, client, user),
+            [rankings] * 50,
+            args.repeat,
+        )
+    measure("parse_delta", parse_delta, deltas, args.repeat)
+    measure("dateutil.parser.parse", dateutil.parser.parse, dates, args.repeat)
+    measure("parse_datetime", parse_datetime, dates, args.repeat)
+    measure(
+        "get_machine_template",
+        lambda n: get_machine_template(
+            "/vault/", n[0], n[1]["aggregate"], n[1]["maker"], n[2], n[3]
+        ),
+        notes,
+        args.repeat,
+    )
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Requests/sec of one-off `requests.get` calls against the pooled `HTBClient` session.
+
+A small keep-alive HTTP server on localhost stands in for the API, so the numbers
+only measure connection handling, not Hack The Box itself. The client gets a rate
+limiter too generous to ever wait, and every request goes to a different endpoint
+so none of them are merged by single-flight.
+
+Usage::
+
+    python benchmarks/bench_session.py --requests 2000 --threads 8
+
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from hackthebox import HTBClient  # noqa: E402
+from hackthebox.ratelimit import RateLimiter  # noqa: E402
+
+BODY = json.dumps({"info": {"id": 1, "name": "Lame"}}).encode()
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+def run(label, func, total, threads):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(func, range(total)))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<10} {total / elapsed:10.1f} req/s ({elapsed:.2f}s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    api_base = f"http://127.0.0.1:{server.server_port}/api/v4/"
+
+    def one_off(i):
+        return requests.get(f"{api_base}machine/profile/{i}").json()
+
+    run("requests", one_off, args.requests, args.threads)
+    unlimited = RateLimiter(budgets={"default": (1e9, 1e9)})
+    client = HTBClient(
+        app_token="benchmark",
+        api_base=api_base,
+        pool_size=args.threads,
+        rate_limiter=unlimited,
+    )
+    run(
+        "session",
+        lambda i: client.do_request(f"machine/profile/{i}"),
+        args.requests,
+        args.threads,
+    )
+    client.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
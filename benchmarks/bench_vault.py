@@ -0,0 +1,228 @@
+"""
+End-to-end timings of the `htb_api.py` create and bulk-update flows against the mock API.
+
+Every scenario gets a fresh mock server, vault and response cache, and runs the script
+exactly as the Obsidian buttons do:
+
+* ``create`` runs ``htb_api.py -m <name>`` for a sample of machines, one process each
+* ``bulk`` seeds ``Machines/`` with one folder per machine and runs ``htb_api.py -m ""``
+
+Each scenario reports wall time, notes per second, API requests issued, the peak RSS of
+the largest process and the number of files written. Results can be saved as JSON and
+compared against an earlier run, failing when throughput drops by more than a threshold.
+
+Usage::
+
+    python benchmarks/bench_vault.py --sizes 10 100 1000 --latencies 0 0.05 --output run.json
+    python benchmarks/bench_vault.py --baseline run.json --threshold 0.2
+
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from mock_htb import Catalog, Faults, create_app, serve  # noqa: E402
+
+SCRIPT = os.path.join(ROOT, "htb_api.py")
+
+
+def snapshot(path):
+    """Modification time and size of every file under a directory"""
+    files = {}
+    for directory, _, names in os.walk(path):
+        for name in names:
+            file_path = os.path.join(directory, name)
+            stat = os.stat(file_path)
+            files[file_path] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+def written(before, after):
+    return sum(1 for path, stat in after.items() if before.get(path) != stat)
+
+
+def run_script(workdir, api_base, machine_name, extra_args):
+    """Run `htb_api.py` to completion
+
+    Returns:
+        The peak RSS in KiB of the `htb_api.py` process, which refreshes every note itself
+
+    """
+    env = dict(os.environ, XDG_CACHE_HOME=os.path.join(workdir, "cache"))
+    command = [
+        sys.executable,
+        SCRIPT,
+        "-m",
+        machine_name,
+        "-v",
+        os.path.join(workdir, "vault") + "/",
+        "--api-base",
+        api_base,
+        *extra_args,
+    ]
+    process = subprocess.Popen(
+        command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+    stderr = process.stderr.read()
+    process.stderr.close()
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode:
+        raise RuntimeError(f"htb_api.py failed:\n{stderr.decode()}")
+    return usage.ru_maxrss
+
+
+def run_scenario(flow, size, latency, args):
+    catalog = Catalog(machines=size, seed=args.seed)
+    server, api_base = serve(create_app(catalog, Faults(latency=latency)))
+    mock_root = api_base.split("/api/")[0]
+    workdir = tempfile.mkdtemp(prefix="htnotes-bench-")
+    try:
+        os.makedirs(os.path.join(workdir, "vault", "Machines"))
+        names = [m["name"] for m in catalog.machines.values()]
+        if flow == "create":
+            names = names[: args.create_sample]
+        else:
+            names = names[: args.max_notes or None]
+            for name in names:
+                os.makedirs(os.path.join(workdir, "vault", "Machines", name))
+
+        before = snapshot(os.path.join(workdir, "vault"))
+        requests.post(mock_root + "/_mock/reset")
+        peak_rss = 0
+        start = time.perf_counter()
+        if flow == "create":
+            for name in names:
+                rss = run_script(workdir, api_base, name, args.script_args)
+                peak_rss = max(peak_rss, rss)
+        else:
+            peak_rss = run_script(workdir, api_base, "", args.script_args)
+        wall = time.perf_counter() - start
+        counts = requests.get(mock_root + "/_mock/stats").json()
+        after = snapshot(os.path.join(workdir, "vault"))
+    finally:
+        server.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "flow": flow,
+        "machines": size,
+        "latency": latency,
+        "notes": len(names),
+        "wall": round(wall, 3),
+        "notes_per_sec": round(len(names) / wall, 3),
+        "requests": counts.get("total", 0),
+        "peak_rss_kib": peak_rss,
+        "files_written": written(before, after),
+    }
+
+
+def compare(results, baseline, threshold):
+    """Print throughput against a baseline run
+
+    Returns:
+        The scenarios that regressed by more than the threshold
+
+    """
+    previous = {
+        (r["flow"], r["machines"], r["latency"]): r for r in baseline["results"]
+    }
+    regressions = []
+    for result in results:
+        old = previous.get((result["flow"], result["machines"], result["latency"]))
+        if old is None:
+            continue
+        change = result["notes_per_sec"] / old["notes_per_sec"] - 1
+        label = f"{result['flow']} machines={result['machines']} latency={result['latency']}"
+        print(f"{label:<40} {change:+8.1%} notes/s vs baseline")
+        if change < -threshold:
+            regressions.append(label)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--latencies", type=float, nargs="+", default=[0.0, 0.05])
+    parser.add_argument(
+        "--flows", nargs="+", choices=["create", "bulk"], default=["create", "bulk"]
+    )
+    parser.add_argument(
+        "--create-sample",
+        type=int,
+        default=5,
+        help="Machines created per create scenario",
+    )
+    parser.add_argument(
+        "--max-notes",
+        type=int,
+        default=100,
+        help="Cap on the notes in a bulk vault; 0 means one per catalog machine",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--script-args",
+        nargs=argparse.REMAINDER,
+        default=[],
+        help="Extra arguments passed to htb_api.py, e.g. --no-cache",
+    )
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="A previous --output to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Fail when notes/s drops by more than this fraction of the baseline",
+    )
+    args = parser.parse_args()
+
+    results = []
+    print(
+        f"{'flow':<7} {'machines':>8} {'latency':>7} {'notes':>5} {'wall':>8} "
+        f"{'notes/s':>8} {'requests':>8} {'rss KiB':>8} {'files':>5}"
+    )
+    for size in args.sizes:
+        for latency in args.latencies:
+            for flow in args.flows:
+                r = run_scenario(flow, size, latency, args)
+                results.append(r)
+                print(
+                    f"{r['flow']:<7} {r['machines']:>8} {r['latency']:>7} {r['notes']:>5} "
+                    f"{r['wall']:>8.2f} {r['notes_per_sec']:>8.2f} {r['requests']:>8} "
+                    f"{r['peak_rss_kib']:>8} {r['files_written']:>5}"
+                )
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print(f"Throughput regressed by more than {args.threshold:.0%}:")
+            for label in regressions:
+                print(f"  {label}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
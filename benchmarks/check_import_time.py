@@ -0,0 +1,115 @@
+"""
+Check the import time of the single-machine button path against a budget.
+
+Runs ``python -X importtime htb_api.py -m <machine>`` against the mock API several times,
+takes the median of the total import time and lists the slowest modules. Exits 1 if the
+total is over ``--budget`` milliseconds, or if any module in ``--forbid`` was imported at
+all, since those only belong on other paths.
+
+Usage::
+
+    python benchmarks/check_import_time.py --budget 200 --runs 5
+
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from mock_htb import Catalog, create_app, serve  # noqa: E402
+
+# "import time:  self [us] | cumulative | imported package", nested imports indented
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$")
+
+# Only needed by async code, old date formats or cassettes
+FORBIDDEN = ["asyncio", "dateutil", "gzip"]
+
+
+def import_times(command, env):
+    """Run a command under ``-X importtime``
+
+    Returns:
+        The self time of every module imported, and the total import time, in microseconds
+
+    """
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", *command],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    ).stderr
+    modules = {}
+    total = 0
+    for line in stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        modules[name] = int(self_us)
+        if not indent:
+            total += int(cumulative_us)
+    return modules, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget", type=float, default=200, help="Milliseconds")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="Slowest modules to list")
+    parser.add_argument("--forbid", nargs="*", default=FORBIDDEN)
+    args = parser.parse_args()
+
+    catalog = Catalog(machines=10)
+    server, api_base = serve(create_app(catalog))
+    machine = catalog.machines[1]["name"]
+    totals = []
+    with tempfile.TemporaryDirectory() as workdir:
+        env = dict(os.environ, XDG_CACHE_HOME=workdir)
+        command = [
+            os.path.join(ROOT, "htb_api.py"),
+            "-m",
+            machine,
+            "-v",
+            workdir + "/",
+            "--api-base",
+            api_base,
+        ]
+        for _ in range(args.runs):
+            modules, total = import_times(command, env)
+            totals.append(total)
+    server.shutdown()
+
+    total_ms = statistics.median(totals) / 1000
+    print(
+        f"Import time: {total_ms:.1f} ms (median of {args.runs}, budget {args.budget} ms)"
+    )
+    print(f"{len(modules)} modules; slowest by self time:")
+    for name, self_us in sorted(modules.items(), key=lambda m: -m[1])[: args.top]:
+        print(f"  {self_us / 1000:8.2f} ms  {name}")
+
+    failed = False
+    forbidden = sorted(
+        root
+        for root in args.forbid
+        if any(name == root or name.startswith(root + ".") for name in modules)
+    )
+    if forbidden:
+        print("Imported but not needed here: " + ", ".join(sorted(forbidden)))
+        failed = True
+    if total_ms > args.budget:
+        print(f"Over budget by {total_ms - args.budget:.1f} ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
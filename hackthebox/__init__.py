@@ -1,11 +1,63 @@
-from .challenge import Challenge
-from .endgame import Endgame
+from typing import TYPE_CHECKING
+
+from . import errors as _errors
 from .errors import *
-from .fortress import Fortress
-from .htb import HTBClient, HTBObject
-from .machine import Machine, MachineInstance
-from .search import Search
-from .solve import *
-from .team import Team
-from .user import User
-from .vpn import VPNServer
+
+# Submodules pull in `requests` and `asyncio`, so they are only imported when one of their
+# names is first used (PEP 562)
+_EXPORTS = {
+    "AsyncHTBClient": "aio",
+    "ActiveSession": "connections",
+    "Challenge": "challenge",
+    "Connections": "connections",
+    "Endgame": "endgame",
+    "Fortress": "fortress",
+    "HTBClient": "htb",
+    "HTBObject": "htb",
+    "Machine": "machine",
+    "MachineBundle": "machine",
+    "MachineInstance": "machine",
+    "MachineListing": "listing",
+    "Search": "search",
+    "Solve": "solve",
+    "MachineSolve": "solve",
+    "ChallengeSolve": "solve",
+    "EndgameSolve": "solve",
+    "FortressSolve": "solve",
+    "Team": "team",
+    "User": "user",
+    "VPNServer": "vpn",
+}
+
+__all__ = [name for name in vars(_errors) if not name.startswith("_")] + list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
+
+
+if TYPE_CHECKING:
+    from .aio import AsyncHTBClient
+    from .challenge import Challenge
+    from .connections import ActiveSession, Connections
+    from .endgame import Endgame
+    from .fortress import Fortress
+    from .htb import HTBClient, HTBObject
+    from .machine import Machine, MachineBundle, MachineInstance
+    from .listing import MachineListing
+    from .search import Search
+    from .solve import *
+    from .team import Team
+    from .user import User
+    from .vpn import VPNServer
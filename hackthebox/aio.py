@@ -0,0 +1,231 @@
+"""
+An asyncio interface to the API, for code that runs on an event loop.
+
+`AsyncHTBClient` wraps an `HTBClient` and runs its blocking calls on a bounded pool of
+worker threads, so many requests can be awaited at once over the same pooled session. Only
+the requests are asynchronous: creating an `AsyncHTBClient` without a client logs in
+synchronously, in the constructor, like `HTBClient` does.
+
+Examples:
+    Fetching several machines at once::
+
+        from hackthebox import AsyncHTBClient
+
+        async def main():
+            async with AsyncHTBClient(app_token=token, max_concurrency=32) as client:
+                machines = await asyncio.gather(*(client.get_machine(m) for m in range(1, 50)))
+                retired = await client.get_machines(retired=True, prefetch=True)
+                authors = await client.resolve(machines[0], "authors")
+
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List, Optional, Union, TYPE_CHECKING
+
+from .htb import HTBClient, HTBObject
+
+if TYPE_CHECKING:
+    from .user import User
+    from .search import Search
+    from .machine import Machine, MachineBundle, MachineInstance
+    from .listing import MachineListing
+    from .connections import ActiveSession, Connections
+    from .challenge import Challenge
+    from .endgame import Endgame
+    from .fortress import Fortress
+    from .team import Team
+    from .leaderboard import Leaderboard
+    from .vpn import VPNServer
+
+
+class AsyncHTBClient:
+    """An asyncio counterpart of `HTBClient`
+
+    Every coroutine mirrors the `HTBClient` method of the same name and returns the same objects.
+    Requests are run on a bounded pool of worker threads sharing the pooled session of the
+    wrapped `HTBClient`, so at most `max_concurrency` requests are in flight at once.
+
+    Objects returned are bound to the wrapped `HTBClient`, so their lazy attributes still work
+    synchronously. Use `hydrate` and `resolve` to fill them without blocking the event loop.
+
+    Args:
+        client: An already authenticated `HTBClient` to wrap. It stays open when this client is
+                closed. If not given, one is created from the remaining keyword arguments.
+        max_concurrency: The maximum number of requests in flight at once
+        **kwargs: Passed through to `HTBClient`
+
+    Attributes:
+        client: The wrapped `HTBClient`
+
+    """
+
+    client: HTBClient
+    _owns_client: bool
+    _executor: ThreadPoolExecutor
+
+    def __init__(
+        self, client: Optional[HTBClient] = None, max_concurrency: int = 16, **kwargs
+    ):
+        self._owns_client = client is None
+        if client is None:
+            kwargs.setdefault("pool_size", max_concurrency)
+            client = HTBClient(**kwargs)
+        self.client = client
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="htb-async"
+        )
+
+    async def __aenter__(self) -> "AsyncHTBClient":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        """Wait for outstanding requests, and close the wrapped client if this one created it"""
+        await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(self._executor.shutdown, wait=True)
+        )
+        if self._owns_client:
+            self.client.close()
+
+    async def _run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking client call on the worker pool"""
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs)
+        )
+
+    async def do_request(self, endpoint, **kwargs) -> Union[dict, bytes]:
+        """Coroutine version of `HTBClient.do_request`"""
+        return await self._run(self.client.do_request, endpoint, **kwargs)
+
+    async def hydrate(
+        self,
+        objects: Iterable[HTBObject],
+        attrs: Optional[Iterable[str]] = None,
+        max_workers: Optional[int] = None,
+    ) -> List[HTBObject]:
+        """Coroutine version of `HTBClient.hydrate`, taking the same arguments"""
+        return await self._run(self.client.hydrate, objects, attrs, max_workers)
+
+    async def resolve(self, obj: Any, attribute: str) -> Any:
+        """Read an attribute which may need a request, such as `Machine.authors` or `Machine.ip`
+
+        Args:
+            obj: The object to read from
+            attribute: The name of the attribute or property
+
+        Returns: The value of the attribute
+
+        """
+        return await self._run(getattr, obj, attribute)
+
+    async def search(self, search_term: str) -> "Search":
+        return await self._run(self.client.search, search_term)
+
+    async def get_machine(self, machine_id: int | str) -> "Machine":
+        return await self._run(self.client.get_machine, machine_id)
+
+    async def get_tags_machine(self, machine_id: int | str) -> list:
+        return await self._run(self.client.get_tags_machine, machine_id)
+
+    async def get_matrix(self, machine_id: int | str) -> dict:
+        return await self._run(self.client.get_matrix, machine_id)
+
+    async def get_user_rating(self, machine_id: int | str) -> dict:
+        return await self._run(self.client.get_user_rating, machine_id)
+
+    async def get_machine_bundle(self, machine_id: int | str) -> "MachineBundle":
+        return await self._run(self.client.get_machine_bundle, machine_id)
+
+    async def get_machine_listing(self, refresh: bool = False) -> "MachineListing":
+        return await self._run(self.client.get_machine_listing, refresh)
+
+    async def is_machine_active(self, machine_id: int | str) -> bool:
+        return await self._run(self.client.is_machine_active, machine_id)
+
+    async def get_active_session(self) -> "ActiveSession":
+        return await self._run(self.client.get_active_session)
+
+    async def get_connections(self, refresh: bool = False) -> "Connections":
+        return await self._run(self.client.get_connections, refresh)
+
+    async def get_todo_machines(self, limit: int = None) -> List[int]:
+        return await self._run(self.client.get_todo_machines, limit)
+
+    async def get_active_machine(
+        self, release_arena: bool = False
+    ) -> Optional["MachineInstance"]:
+        return await self._run(self.client.get_active_machine, release_arena)
+
+    async def get_machines(
+        self,
+        limit: int = None,
+        retired: bool = False,
+        prefetch: bool = False,
+        refresh: bool = False,
+    ) -> List["Machine"]:
+        machines = await self._run(
+            self.client.get_machines, limit, retired, False, refresh
+        )
+        if prefetch:
+            await self.hydrate(machines)
+        return machines
+
+    async def get_challenge(self, challenge_id: int | str) -> "Challenge":
+        return await self._run(self.client.get_challenge, challenge_id)
+
+    async def get_challenges(
+        self, limit=None, retired=False, prefetch: bool = False
+    ) -> List["Challenge"]:
+        challenges = await self._run(self.client.get_challenges, limit, retired)
+        if prefetch:
+            await self.hydrate(challenges)
+        return challenges
+
+    async def get_endgame(self, endgame_id: int) -> "Endgame":
+        return await self._run(self.client.get_endgame, endgame_id)
+
+    async def get_endgames(self, limit: int = None) -> List["Endgame"]:
+        return await self._run(self.client.get_endgames, limit)
+
+    async def get_fortress(self, fortress_id: int) -> "Fortress":
+        return await self._run(self.client.get_fortress, fortress_id)
+
+    async def get_fortresses(self, limit: int = None) -> List["Fortress"]:
+        return await self._run(self.client.get_fortresses, limit)
+
+    async def get_user(self, user_id: int) -> "User":
+        return await self._run(self.client.get_user, user_id)
+
+    async def get_team(self, team_id: int) -> "Team":
+        return await self._run(self.client.get_team, team_id)
+
+    async def get_hof(self, vip: bool = False, prefetch: bool = False) -> "Leaderboard":
+        leaderboard = await self._run(self.client.get_hof, vip)
+        if prefetch:
+            await self.hydrate(leaderboard)
+        return leaderboard
+
+    async def get_hof_countries(self) -> "Leaderboard":
+        return await self._run(self.client.get_hof_countries)
+
+    async def get_hof_teams(self) -> "Leaderboard":
+        return await self._run(self.client.get_hof_teams)
+
+    async def get_hof_universities(self) -> "Leaderboard":
+        return await self._run(self.client.get_hof_universities)
+
+    async def get_current_vpn_server(self, release_arena=False) -> "VPNServer":
+        return await self._run(self.client.get_current_vpn_server, release_arena)
+
+    async def get_all_vpn_servers(self, release_arena=False) -> "List[VPNServer]":
+        return await self._run(self.client.get_all_vpn_servers, release_arena)
+
+    async def get_user_info(self) -> "User":
+        """Coroutine version of the `HTBClient.user` property"""
+        return await self.resolve(self.client, "user")
@@ -0,0 +1,365 @@
+"""
+A persistent cache of API responses, stored in SQLite.
+
+Each cacheable endpoint gets a time-to-live from the first matching pattern in `ttls`.
+Fresh entries are served without touching the network; stale entries are revalidated with
+`If-None-Match`/`If-Modified-Since` when the server gave us a validator. A TTL of 0 keeps
+the response only to revalidate it: every request asks the server, but an unchanged
+response costs a 304 rather than the whole body. Once the database grows past `max_bytes`,
+the least recently used entries are evicted.
+
+Retired machines get a permanent tier: once a machine is known to be retired, its tags,
+matrix and difficulty graph are kept without an expiry and cost no requests at all. Its
+profile, which carries the user's own flags, is still revalidated on every request.
+
+Examples:
+    Caching responses between runs::
+
+        cache = ResponseCache("~/.cache/htnotes/responses.sqlite")
+        client = HTBClient(app_token=token, response_cache=cache)
+
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional, Sequence, Set, Tuple
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+# First matching pattern wins; endpoints matching none are not cached. The profile carries
+# the user's own flags, which change the moment a flag is submitted, so it is always
+# revalidated.
+DEFAULT_TTLS: Tuple[Tuple[str, float], ...] = (
+    ("machine/profile/*", 0),
+    ("machine/tags/*", 7 * DAY),
+    ("machine/graph/matrix/*", DAY),
+    ("machine/graph/owns/difficulty/*", DAY),
+    ("machine/list", 5 * MINUTE),
+    ("machine/list/retired", HOUR),
+    ("challenge/info/*", HOUR),
+    ("challenge/list*", HOUR),
+    ("user/profile/basic/*", HOUR),
+    ("team/info/*", HOUR),
+)
+
+# Endpoints whose responses stop changing once their machine is retired
+RETIRED_STATIC_ENDPOINTS: Tuple[str, ...] = (
+    "machine/tags/{}",
+    "machine/graph/matrix/{}",
+    "machine/graph/owns/difficulty/{}",
+)
+_RETIRED_STATIC_RE = re.compile(
+    r"^machine/(?:tags|graph/matrix|graph/owns/difficulty)/(\d+)$"
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    endpoint TEXT PRIMARY KEY,
+    body TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL NOT NULL,
+    expires_at REAL,
+    accessed_at REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at);
+CREATE TABLE IF NOT EXISTS retired_machines (
+    machine_id INTEGER PRIMARY KEY
+);
+"""
+
+
+class CacheEntry:
+    """A response stored in the cache
+
+    Attributes:
+        endpoint: The endpoint the response was fetched from
+        body: The raw JSON text of the response
+        etag: The `ETag` the server sent, if any
+        last_modified: The `Last-Modified` date the server sent, if any
+        fresh: Whether the entry can be used without asking the server
+
+    """
+
+    endpoint: str
+    body: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fresh: bool
+
+    def __init__(
+        self,
+        endpoint: str,
+        body: str,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        fresh: bool,
+    ):
+        self.endpoint = endpoint
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fresh = fresh
+
+    def validators(self) -> Dict[str, str]:
+        """
+        Returns: The conditional request headers to revalidate this entry with
+        """
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """SQLite-backed API response cache, safe to share between threads and processes
+
+    Args:
+        path: The database file. Parent directories are created if needed.
+        ttls: (glob pattern, seconds) pairs; the first pattern matching an endpoint sets its TTL.
+              A TTL of 0 stores responses only to revalidate them.
+        max_bytes: The size the stored bodies are kept under by evicting the oldest-used entries
+
+    Attributes:
+        refresh: Treat every entry as stale, so each one is fetched again or revalidated
+        hits: Requests served from a fresh entry
+        misses: Requests that had no entry or a stale one
+        revalidated: Stale entries the server confirmed unchanged
+
+    """
+
+    refresh: bool = False
+    hits: int
+    misses: int
+    revalidated: int
+    _path: str
+    _ttls: Tuple[Tuple[str, float], ...]
+    _max_bytes: int
+    _local: threading.local
+    _retired: Set[int]
+
+    def __init__(
+        self,
+        path: str,
+        ttls: Sequence[Tuple[str, float]] = DEFAULT_TTLS,
+        max_bytes: int = 64 * 1024 * 1024,
+    ):
+        self._path = os.path.expanduser(path)
+        self._ttls = tuple(ttls)
+        self._max_bytes = max_bytes
+        self._local = threading.local()
+        self.hits = self.misses = self.revalidated = 0
+        directory = os.path.dirname(self._path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db.executescript(_SCHEMA)
+        self._retired = {
+            row[0]
+            for row in self._db.execute("SELECT machine_id FROM retired_machines")
+        }
+
+    @property
+    def _db(self) -> sqlite3.Connection:
+        """The connection for the current thread - sqlite3 connections can't be shared"""
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self._path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def ttl_for(self, endpoint: str) -> Optional[float]:
+        """
+        Args:
+            endpoint: The API endpoint
+
+        Returns: How long responses from the endpoint stay fresh, or None if they are not cached
+
+        """
+        for pattern, ttl in self._ttls:
+            if fnmatch.fnmatchcase(endpoint, pattern):
+                return ttl
+        return None
+
+    def is_permanent(self, endpoint: str) -> bool:
+        """
+        Args:
+            endpoint: The API endpoint
+
+        Returns: Whether responses from the endpoint are kept without an expiry
+
+        """
+        match = _RETIRED_STATIC_RE.match(endpoint)
+        return match is not None and int(match.group(1)) in self._retired
+
+    def mark_retired(self, machine_ids: Iterable[int]):
+        """Move the static endpoints of retired machines into the permanent tier
+
+        Args:
+            machine_ids: The IDs of machines known to be retired
+
+        """
+        new = {int(machine_id) for machine_id in machine_ids} - self._retired
+        if not new:
+            return
+        self._retired |= new
+        self._db.executemany(
+            "INSERT OR IGNORE INTO retired_machines VALUES (?)",
+            [(machine_id,) for machine_id in new],
+        )
+        self._db.executemany(
+            "UPDATE responses SET expires_at = NULL WHERE endpoint = ?",
+            [
+                (template.format(machine_id),)
+                for machine_id in new
+                for template in RETIRED_STATIC_ENDPOINTS
+            ],
+        )
+
+    def lookup(self, endpoint: str) -> Optional[CacheEntry]:
+        """Find the stored response for an endpoint
+
+        Args:
+            endpoint: The API endpoint
+
+        Returns: The `CacheEntry`, or None if nothing is stored
+
+        """
+        now = time.time()
+        row = self._db.execute(
+            "SELECT body, etag, last_modified, fetched_at, expires_at FROM responses "
+            "WHERE endpoint = ?",
+            (endpoint,),
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        body, etag, last_modified, fetched_at, expires_at = row
+        ttl = self.ttl_for(endpoint)
+        if ttl is None:
+            fresh = False
+        elif expires_at is None:
+            fresh = not self.refresh and self.is_permanent(endpoint)
+        else:
+            # Entries stored under a longer TTL than the current one don't outlive it
+            fresh = not self.refresh and min(expires_at, fetched_at + ttl) > now
+        if fresh:
+            self.hits += 1
+        else:
+            self.misses += 1
+        self._db.execute(
+            "UPDATE responses SET accessed_at = ? WHERE endpoint = ?", (now, endpoint)
+        )
+        return CacheEntry(endpoint, body, etag, last_modified, fresh)
+
+    def store(
+        self,
+        endpoint: str,
+        body: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ):
+        """Save a response, evicting old entries if the cache is over its size cap
+
+        Args:
+            endpoint: The API endpoint
+            body: The raw JSON text of the response
+            etag: The `ETag` response header
+            last_modified: The `Last-Modified` response header
+
+        """
+        ttl = self.ttl_for(endpoint)
+        if ttl is None:
+            return
+        now = time.time()
+        expires_at = None if self.is_permanent(endpoint) else now + ttl
+        self._db.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (endpoint, body, etag, last_modified, now, expires_at, now, len(body)),
+        )
+        self._evict()
+
+    def touch(self, endpoint: str):
+        """Mark an entry fresh again after the server confirmed it is unchanged"""
+        ttl = self.ttl_for(endpoint)
+        if ttl is None:
+            return
+        now = time.time()
+        expires_at = None if self.is_permanent(endpoint) else now + ttl
+        self.revalidated += 1
+        self._db.execute(
+            "UPDATE responses SET fetched_at = ?, expires_at = ? WHERE endpoint = ?",
+            (now, expires_at, endpoint),
+        )
+
+    def expire(self, endpoints: Iterable[str]):
+        """Mark entries stale, so the next request for each one is revalidated
+
+        Permanent entries go back to the permanent tier once the server confirms them.
+
+        Args:
+            endpoints: The API endpoints
+
+        """
+        now = time.time()
+        self._db.executemany(
+            "UPDATE responses SET expires_at = ? WHERE endpoint = ?",
+            [(now, endpoint) for endpoint in endpoints],
+        )
+
+    def _evict(self):
+        """Drop least recently used entries until the cache is under `max_bytes`
+
+        Permanent entries are only dropped once every expiring entry is gone.
+        """
+        total = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+        if total <= self._max_bytes:
+            return
+        rows = self._db.execute(
+            "SELECT endpoint, size FROM responses "
+            "ORDER BY expires_at IS NULL, accessed_at"
+        ).fetchall()
+        victims = []
+        for endpoint, size in rows:
+            if total <= self._max_bytes:
+                break
+            victims.append((endpoint,))
+            total -= size
+        self._db.executemany("DELETE FROM responses WHERE endpoint = ?", victims)
+
+    def clear(self):
+        """Remove every stored response and forget which machines are retired"""
+        self._db.execute("DELETE FROM responses")
+        self._db.execute("DELETE FROM retired_machines")
+        self._retired = set()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns: Hit, miss and revalidation counts, plus the number and size of stored entries
+        """
+        entries, permanent, size = self._db.execute(
+            "SELECT COUNT(*), COUNT(*) - COUNT(expires_at), COALESCE(SUM(size), 0) "
+            "FROM responses"
+        ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+            "entries": entries,
+            "permanent": permanent,
+            "bytes": size,
+        }
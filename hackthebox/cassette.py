@@ -0,0 +1,224 @@
+"""
+Record and replay API exchanges, so the client can run without network access.
+
+In record mode every response the client receives is captured along with the request that
+produced it. In replay mode requests are answered from the recording instead of the network;
+repeated requests are answered in the order they were recorded, and once the recording runs
+out the last answer is repeated.
+
+Cassettes are gzipped JSON lines. Request bodies are only stored as a hash, so credentials
+sent to the login endpoints never reach the file, and the tokens the login endpoints answer
+with are replaced by a placeholder that replays as a token which never expires.
+
+Examples:
+    Recording a session and replaying it with 50ms of latency per request::
+
+        with Cassette("session.jsonl.gz", "record") as cassette:
+            client = HTBClient(app_token=token, cassette=cassette)
+            client.get_machine("Lame")
+
+        client = HTBClient(app_token="", cassette=Cassette("session.jsonl.gz", "replay", latency=0.05))
+        client.get_machine("Lame")
+
+"""
+
+from __future__ import annotations
+
+import base64
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from .errors import CassetteException
+from .ratelimit import endpoint_class
+
+# Response headers worth keeping for the cache and rate limiter
+_KEPT_HEADERS = (
+    "Content-Type",
+    "ETag",
+    "Last-Modified",
+    "Retry-After",
+    "X-RateLimit-Limit",
+    "X-RateLimit-Remaining",
+    "X-RateLimit-Reset",
+)
+
+_Key = Tuple[str, str, str]
+
+# A JWT-shaped stand-in for recorded tokens, expiring in 2100 so replays never refresh it
+REDACTED_TOKEN = (
+    "redacted."
+    + base64.b64encode(b'{"exp":4102444800}').decode().rstrip("=")
+    + ".redacted"
+)
+
+
+def _redact_tokens(value: Any) -> Any:
+    """Replace every ``*_token`` string in a decoded JSON body with `REDACTED_TOKEN`"""
+    if isinstance(value, dict):
+        return {
+            key: (
+                REDACTED_TOKEN
+                if key.endswith("token") and isinstance(item, str)
+                else _redact_tokens(item)
+            )
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_redact_tokens(item) for item in value]
+    return value
+
+
+def _payload_hash(json_data=None, data=None) -> str:
+    if not json_data and not data:
+        return ""
+    payload = json.dumps([json_data, data], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+class Cassette:
+    """A recording of API exchanges
+
+    Args:
+        path: The cassette file
+        mode: ``"record"`` to capture exchanges, ``"replay"`` to serve them
+        latency: Seconds to wait before answering each replayed request
+
+    Attributes:
+        mode: Whether the cassette is recording or replaying
+        latency: Seconds added to each replayed request
+
+    """
+
+    mode: str
+    latency: float
+    _path: str
+    _exchanges: List[dict]
+    _replay: Dict[_Key, List[dict]]
+    _positions: Dict[_Key, int]
+    _lock: threading.Lock
+
+    def __init__(self, path: str, mode: str = "replay", latency: float = 0.0):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode {mode!r}")
+        self._path = path
+        self.mode = mode
+        self.latency = latency
+        self._exchanges = []
+        self._replay = {}
+        self._positions = {}
+        self._lock = threading.Lock()
+        if mode == "replay":
+            if not os.path.exists(path):
+                raise CassetteException(f"No cassette at {path}")
+            with gzip.open(path, "rt") as f:
+                for line in f:
+                    exchange = json.loads(line)
+                    key = (
+                        exchange["method"],
+                        exchange["endpoint"],
+                        exchange["payload"],
+                    )
+                    self._replay.setdefault(key, []).append(exchange)
+
+    def __enter__(self) -> "Cassette":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.save()
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def record(
+        self,
+        method: str,
+        endpoint: str,
+        response: requests.Response,
+        json_data=None,
+        data=None,
+    ):
+        """Capture an exchange
+
+        Args:
+            method: The HTTP method
+            endpoint: The API endpoint requested
+            response: The response received
+            json_data: The JSON body sent, if any
+            data: The form body sent, if any
+
+        """
+        if response.headers.get("Content-Type", "").startswith("application/json"):
+            body, encoding = response.text, "text"
+            if endpoint_class(endpoint) == "auth":
+                body = json.dumps(_redact_tokens(response.json()))
+        else:
+            body, encoding = base64.b64encode(response.content).decode(), "base64"
+        exchange = {
+            "method": method,
+            "endpoint": endpoint,
+            "payload": _payload_hash(json_data, data),
+            "status": response.status_code,
+            "headers": {
+                name: response.headers[name]
+                for name in _KEPT_HEADERS
+                if name in response.headers
+            },
+            "encoding": encoding,
+            "body": body,
+        }
+        with self._lock:
+            self._exchanges.append(exchange)
+
+    def play(
+        self, method: str, endpoint: str, json_data=None, data=None
+    ) -> requests.Response:
+        """Answer a request from the recording
+
+        Args:
+            method: The HTTP method
+            endpoint: The API endpoint requested
+            json_data: The JSON body sent, if any
+            data: The form body sent, if any
+
+        Returns:
+            A `requests.Response` rebuilt from the recorded exchange
+
+        """
+        key = (method, endpoint, _payload_hash(json_data, data))
+        with self._lock:
+            exchanges = self._replay.get(key)
+            if not exchanges:
+                raise CassetteException(f"No recorded response for {method} {endpoint}")
+            position = self._positions.get(key, 0)
+            self._positions[key] = position + 1
+            exchange = exchanges[min(position, len(exchanges) - 1)]
+        if self.latency:
+            time.sleep(self.latency)
+        response = requests.Response()
+        response.status_code = exchange["status"]
+        response.headers = CaseInsensitiveDict(exchange["headers"])
+        response.encoding = "utf-8"
+        if exchange["encoding"] == "base64":
+            response._content = base64.b64decode(exchange["body"])
+        else:
+            response._content = exchange["body"].encode()
+        return response
+
+    def save(self):
+        """Write the recorded exchanges out. Does nothing when replaying."""
+        if self.mode != "record":
+            return
+        with self._lock:
+            exchanges = list(self._exchanges)
+        with gzip.open(self._path, "wt") as f:
+            for exchange in exchanges:
+                f.write(json.dumps(exchange, separators=(",", ":")) + "\n")
@@ -18,8 +18,6 @@ import time
 from datetime import datetime
 from typing import List, Optional, cast, TYPE_CHECKING
 
-import dateutil.parser
-
 from . import htb
 from .constants import DOWNLOAD_COOLDOWN
 from .errors import (
@@ -29,6 +27,7 @@ from .errors import (
     NoDownloadException,
     RateLimitException,
 )
+from .utils import parse_datetime
 
 if TYPE_CHECKING:
     from .htb import HTBClient
@@ -60,12 +59,36 @@ class Challenge(htb.HTBObject):
 
     """
 
+    __slots__ = (
+        "name",
+        "retired",
+        "difficulty",
+        "avg_difficulty",
+        "points",
+        "difficulty_ratings",
+        "solves",
+        "likes",
+        "dislikes",
+        "release_date",
+        "solved",
+        "is_liked",
+        "is_disliked",
+        "recommended",
+        "description",
+        "category",
+        "has_download",
+        "has_docker",
+        "instance",
+        "_authors",
+        "_author_ids",
+    )
+
     name: str
     retired: bool
     difficulty: str
     avg_difficulty: int
     points: int
-    difficulty_ratings = None
+    difficulty_ratings: dict
     solves: int
     likes: int
     dislikes: int
@@ -76,9 +99,10 @@ class Challenge(htb.HTBObject):
     recommended: bool
 
     # noinspection PyUnresolvedReferences
-    _authors: Optional[List["User"]] = None
+    _authors: Optional[List["User"]]
     _author_ids: List[int]
 
+    _detailed_method = "get_challenge"
     _detailed_attributes = (
         "description",
         "category",
@@ -119,6 +143,7 @@ class Challenge(htb.HTBObject):
         )
         if submission["message"] == "Incorrect flag":
             raise IncorrectFlagException
+        self._client.invalidate_challenge(self.id, self.name)
         return True
 
     def start(self) -> DockerInstance:
@@ -189,8 +214,8 @@ class Challenge(htb.HTBObject):
     # noinspection PyUnresolvedReferences
     def __init__(self, data: dict, client: "HTBClient", summary: bool = False):
         """Initialise a `Challenge` using API data"""
-        self._client = client
-        self._detailed_func = client.get_challenge  # type: ignore
+        super().__init__(client, summary)
+        self._authors = None
         self.id = data["id"]
         self.name = data["name"]
         self.retired = bool(data["retired"])
@@ -201,7 +226,7 @@ class Challenge(htb.HTBObject):
         self.solved = data["authUserSolve"]
         self.likes = data["likes"]
         self.dislikes = data["dislikes"]
-        self.release_date = dateutil.parser.parse(data["release_date"])
+        self.release_date = parse_datetime(data["release_date"])
         if not summary:
             self.description = data["description"]
             self.category = data["category_name"]
@@ -216,8 +241,6 @@ class Challenge(htb.HTBObject):
                 )
             else:
                 self.instance = None
-        else:
-            self._is_summary = True
 
 
 class DockerInstance:
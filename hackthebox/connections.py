@@ -0,0 +1,102 @@
+"""
+A short-lived snapshot of the user's VPN connections and what is running on them.
+
+``connections`` says which lab server the user is assigned to and which machine the
+Release Arena is on; ``connections/servers?product=...`` lists the servers of a product and
+the one assigned. `Machine.is_release`, `HTBClient.get_current_vpn_server`,
+`HTBClient.get_all_vpn_servers` and `HTBClient.get_active_machine` all read them from one
+`Connections` kept by the client for a few seconds, instead of each asking the API again.
+Switching server or spawning and stopping a machine drops it.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING, Dict, Optional, Set
+
+if TYPE_CHECKING:
+    from .machine import MachineInstance
+    from .vpn import VPNServer
+
+
+class Connections:
+    """The connection state of the user at one point in time
+
+    Both parts are filled in by the client as they are first needed, and expire together.
+
+    Args:
+        ttl: The number of seconds the snapshot is considered fresh
+
+    Attributes:
+        data: The ``data`` of the ``connections`` response, or None if not fetched yet
+        servers: The ``data`` of ``connections/servers`` per product (``labs`` or
+                 ``release_arena``)
+        expires: When the snapshot stops being fresh, on the `time.monotonic` clock
+
+    """
+
+    data: Optional[dict]
+    servers: Dict[str, dict]
+    expires: float
+
+    def __init__(self, ttl: float):
+        self.data = None
+        self.servers = {}
+        self.expires = time.monotonic() + ttl
+
+    @property
+    def fresh(self) -> bool:
+        """Whether the snapshot is younger than its TTL"""
+        return time.monotonic() < self.expires
+
+    @property
+    def lab_server(self) -> Optional[dict]:
+        """The lab VPN server the user is assigned to"""
+        return ((self.data or {}).get("lab") or {}).get("assigned_server")
+
+    @property
+    def release_arena_machine_id(self) -> Optional[int]:
+        """The ID of the machine on the Release Arena, if there is one"""
+        machine = ((self.data or {}).get("release_arena") or {}).get("machine")
+        return machine["id"] if machine else None
+
+    def assigned_server_ids(self) -> Set[int]:
+        """The IDs of every server the snapshot knows the user to be assigned to"""
+        assigned = [self.lab_server]
+        assigned += [servers.get("assigned") for servers in self.servers.values()]
+        return {server["id"] for server in assigned if server}
+
+    def __repr__(self):
+        return f"<Connections {sorted(self.assigned_server_ids())}>"
+
+
+class ActiveSession:
+    """Everything the user has running, fetched at once by `HTBClient.get_active_session`
+
+    Attributes:
+        connections: The `Connections` snapshot it was built from
+        lab_server: The lab `VPNServer` the user is assigned to
+        machine: The running lab `MachineInstance`, if any
+        release_arena: The running Release Arena `MachineInstance`, if any
+
+    """
+
+    connections: Connections
+    lab_server: Optional[VPNServer]
+    machine: Optional[MachineInstance]
+    release_arena: Optional[MachineInstance]
+
+    def __init__(
+        self,
+        connections: Connections,
+        lab_server: Optional[VPNServer],
+        machine: Optional[MachineInstance],
+        release_arena: Optional[MachineInstance],
+    ):
+        self.connections = connections
+        self.lab_server = lab_server
+        self.machine = machine
+        self.release_arena = release_arena
+
+    def __repr__(self):
+        return f"<ActiveSession {self.machine} {self.release_arena}>"
@@ -1,3 +1,6 @@
 API_BASE = "https://www.hackthebox.com/api/v4/"
 USER_AGENT = "htb-api/0.5.2"
 DOWNLOAD_COOLDOWN = 30
+POOL_SIZE = 10
+MACHINE_LISTING_TTL = 60
+CONNECTIONS_TTL = 10
@@ -22,12 +22,28 @@ class Endgame(htb.HTBObject):
 
     """
 
+    __slots__ = (
+        "name",
+        "avatar",
+        "cover_image",
+        "retired",
+        "vip",
+        "points",
+        "completions",
+        "reset_votes",
+        "entry_points",
+        "description",
+        "_authors",
+        "_author_ids",
+    )
+
     name: str
     avatar: str
     cover_image: str
     retired: bool
     vip: bool
 
+    _detailed_method = "get_endgame"
     _detailed_attributes = (
         "points",
         "completions",
@@ -41,8 +57,8 @@ class Endgame(htb.HTBObject):
     entry_points: List[str]
     description: str
 
-    _authors: Optional[List[User]] = None
-    _author_ids: Optional[List[int]] = None
+    _authors: Optional[List[User]]
+    _author_ids: List[int]
 
     def submit(self, flag: str):
         """Submits a flag for an Endgame
@@ -81,8 +97,8 @@ class Endgame(htb.HTBObject):
         return f"<Endgame '{self.name}'>"
 
     def __init__(self, data: dict, client: htb.HTBClient, summary=False):
-        self._client = client
-        self._detailed_func = client.get_endgame  # type: ignore
+        super().__init__(client, summary)
+        self._authors = None
         self.id = data["id"]
         self.name = data["name"]
         self.avatar = data["avatar_url"]
@@ -98,5 +114,3 @@ class Endgame(htb.HTBObject):
             self.completions = data["players_completed"]
             self.reset_votes = data["endgame_reset_votes"]
             self.description = data["description"]
-        else:
-            self._is_summary = True
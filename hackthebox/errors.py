@@ -8,6 +8,12 @@ class ApiError(HtbException):
     """The API responded in an unexpected way"""
 
 
+class TooManyRequestsException(ApiError):
+    """The API kept responding with 429 after every retry"""
+
+    pass
+
+
 class AuthenticationException(HtbException):
     """An error authenticating to the API"""
 
@@ -135,3 +141,9 @@ class CacheException(HtbException):
     """There was an issue with the token cache"""
 
     pass
+
+
+class CassetteException(HtbException):
+    """A cassette could not be loaded, or has no recording of a request"""
+
+    pass
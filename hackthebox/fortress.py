@@ -22,10 +22,22 @@ class Fortress(htb.HTBObject):
 
     """
 
+    __slots__ = (
+        "name",
+        "image",
+        "num_flags",
+        "reset_votes",
+        "progress",
+        "flags",
+        "company",
+        "ip",
+    )
+
     name: str
     image: str
     num_flags: int
 
+    _detailed_method = "get_fortress"
     _detailed_attributes = ("reset_votes", "progress", "flags", "company", "ip")
     reset_votes: int
     progress: int
@@ -57,14 +69,12 @@ class Fortress(htb.HTBObject):
         return f"<Fortress '{self.name}'>"
 
     def __init__(self, data: dict, client: htb.HTBClient, summary=False):
-        self._client = client
-        self._detailed_func = client.get_fortress  # type: ignore
+        super().__init__(client, summary)
         self.id = data["id"]
         self.name = data["name"]
         self.image = data["image"]
         if summary:
             self.num_flags = data["number_of_flags"]
-            self._is_summary = True
         else:
             self.num_flags = len(data["flags"])
             self.company = Company(data["company"])
@@ -5,23 +5,52 @@ import base64
 import getpass
 import json
 import os
+import threading
 import time
-from typing import List, Callable, Union, Optional, Tuple, cast, Any, TYPE_CHECKING
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import (
+    Any,
+    List,
+    Callable,
+    Iterable,
+    Union,
+    Optional,
+    Tuple,
+    cast,
+    TYPE_CHECKING,
+)
 
 import requests
-
-from .constants import API_BASE, USER_AGENT
+from requests.adapters import HTTPAdapter
+
+from .connections import Connections
+from .constants import (
+    API_BASE,
+    USER_AGENT,
+    POOL_SIZE,
+    MACHINE_LISTING_TTL,
+    CONNECTIONS_TTL,
+)
 from .errors import (
     AuthenticationException,
     NotFoundException,
     IncorrectOTPException,
     ApiError,
+    TooManyRequestsException,
 )
+from .identity import IdentityMap
+from .listing import MachineListing
+from .metrics import Metrics
+from .ratelimit import RateLimiter
+from .singleflight import SingleFlight
 
 if TYPE_CHECKING:
+    from .cache import ResponseCache
+    from .connections import ActiveSession
+    from .cassette import Cassette
     from .user import User
     from .search import Search
-    from .machine import Machine, MachineInstance
+    from .machine import Machine, MachineBundle, MachineInstance
     from .challenge import Challenge
     from .endgame import Endgame
     from .fortress import Fortress
@@ -47,6 +76,14 @@ def jwt_expired(token: str) -> bool:
         return False
 
 
+def _result_or_empty(future: Future) -> Any:
+    """The result of an optional request, or an empty list if it failed"""
+    try:
+        return future.result()
+    except Exception:
+        return []
+
+
 class HTBClient:
     """The client via which API requests are made
 
@@ -55,6 +92,15 @@ class HTBClient:
 
             from hackthebox import HTBClient
             client = HTBClient(email="user@example.com", password="S3cr3tP455w0rd!")
+
+        All requests go through a single pooled keep-alive session, so one client can be
+        shared between threads.
+
+        Fetching the full details of a list of summaries concurrently::
+
+            machines = client.get_machines(retired=True, prefetch=True)
+            client.hydrate(client.get_challenges(), attrs=["category"])
+
     Attributes:
         challenge_cooldown: Time when next download is allowed
 
@@ -66,8 +112,43 @@ class HTBClient:
     _refresh_token: Optional[str]
     _app_token: Optional[str]
     _api_base: str
+    _session: requests.Session
+    _token_lock: threading.Lock
+    _rate_limiter: RateLimiter
+    _singleflight: SingleFlight
+    _response_cache: Optional[ResponseCache]
+    _objects: IdentityMap
+    _metrics: Metrics
+    _cassette: Optional[Cassette]
+    _pool_size: int
+    _executor: Optional[ThreadPoolExecutor] = None
+    _executor_lock: threading.Lock
+    _listing: Optional[MachineListing] = None
+    _listing_ttl: float
+    _listing_lock: threading.Lock
+    _connections: Optional[Connections] = None
+    _connections_ttl: float
+    _connections_lock: threading.Lock
     challenge_cooldown: int = 0
 
+    @staticmethod
+    def _build_session(pool_size: int) -> requests.Session:
+        """Create the pooled keep-alive session shared by every request
+
+        Args:
+            pool_size: The maximum number of connections kept open to the API
+
+        Returns:
+            A `requests.Session` with the default headers set
+
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers["User-Agent"] = USER_AGENT
+        return session
+
     def _refresh_access_token(self):
         """
 
@@ -75,11 +156,10 @@ class HTBClient:
         when the current one expires
 
         """
-        headers = {"User-Agent": USER_AGENT}
-        r = requests.post(
+        r = self._session.post(
             self._api_base + "login/refresh",
             json={"refresh_token": self._refresh_token},
-            headers=headers,
+            headers={"Authorization": None},
         )
         data = r.json()["message"]
         if isinstance(data, str) and data.startswith("Unauthenticated"):
@@ -87,6 +167,21 @@ class HTBClient:
         self._access_token = data["access_token"]
         self._refresh_token = data["refresh_token"]
 
+    def _authorize(self):
+        """Make sure the session carries a valid Authorization header"""
+        if self._app_token is not None:
+            token = self._app_token
+        elif self._access_token is not None and self._refresh_token is not None:
+            # Only one thread should spend the refresh token
+            with self._token_lock:
+                if jwt_expired(self._access_token):
+                    self._refresh_access_token()
+            token = self._access_token
+        else:
+            raise AuthenticationException("No authentication tokens available")
+        if self._session.headers.get("Authorization") != "Bearer " + token:
+            self._session.headers["Authorization"] = "Bearer " + token
+
     def do_request(
         self,
         endpoint,
@@ -108,42 +203,102 @@ class HTBClient:
         Returns:
             The JSON response from the API or the raw data (if `download` is set)
 
+        Identical GET requests made concurrently from several threads are coalesced into a
+        single request, and every caller receives the same response object. If the client has
+        a `ResponseCache`, cacheable GET requests are answered from it while fresh.
+
         """
-        headers = {"User-Agent": USER_AGENT}
-        if authorized:
-            # Don't use authorization if the API base URL isn't the real one -
-            # i.e. we're running a test
-            if self._app_token is not None:
-                headers["Authorization"] = "Bearer " + self._app_token
-            elif self._access_token is not None and self._refresh_token is not None:
-                if jwt_expired(self._access_token):
-                    self._refresh_access_token()
-                headers["Authorization"] = "Bearer " + self._access_token
-            else:
-                raise AuthenticationException("No authentication tokens available")
-        while True:
-            if not json_data and not data:
-                if post:
-                    r = requests.post(
-                        self._api_base + endpoint, headers=headers, stream=download
-                    )
-                else:
-                    r = requests.get(
-                        self._api_base + endpoint, headers=headers, stream=download
-                    )
-            else:
-                r = requests.post(
-                    self._api_base + endpoint,
-                    json=json_data,
-                    data=data,
-                    headers=headers,
-                    stream=download,
-                )
-            if r.status_code != 429:
-                break
-            # Not sure on the exact ratelimit - loop until we don't get 429
-            else:
-                time.sleep(1)
+        if not json_data and not data and not post:
+            if download:
+                return self._send("GET", endpoint, authorized=authorized, download=True)
+            leader = False
+
+            def fetch():
+                nonlocal leader
+                leader = True
+                if (
+                    self._response_cache is not None
+                    and self._response_cache.ttl_for(endpoint) is not None
+                ):
+                    return self._cached_get(endpoint, authorized)
+                return self._send("GET", endpoint, authorized=authorized)
+
+            result = self._singleflight.do((endpoint, authorized), fetch)
+            if not leader:
+                self._metrics.deduplicated(endpoint)
+            return result
+        return self._send(
+            "POST",
+            endpoint,
+            json_data=json_data,
+            data=data,
+            authorized=authorized,
+            download=download,
+        )
+
+    def _cached_get(self, endpoint, authorized=True) -> dict:
+        """GET an endpoint through the response cache, revalidating stale entries
+
+        Args:
+            endpoint: The API endpoint to request
+            authorized: If the request requires an Authorization header
+        Returns:
+            The JSON response from the cache or the API
+
+        """
+        cache = cast("ResponseCache", self._response_cache)
+        entry = cache.lookup(endpoint)
+        if entry is not None and entry.fresh:
+            self._metrics.cache_hit(endpoint)
+            return json.loads(entry.body)
+        r = self._request(
+            "GET",
+            endpoint,
+            authorized=authorized,
+            headers=entry.validators() if entry is not None else None,
+        )
+        if r.status_code == 304 and entry is not None:
+            cache.touch(endpoint)
+            return json.loads(entry.body)
+        if r.status_code == 404:
+            raise NotFoundException
+        result = r.json()
+        if r.status_code == 200:
+            cache.store(
+                endpoint, r.text, r.headers.get("ETag"), r.headers.get("Last-Modified")
+            )
+        return result
+
+    def _send(
+        self,
+        method,
+        endpoint,
+        json_data=None,
+        data=None,
+        authorized=True,
+        download=False,
+    ) -> Union[dict, bytes]:
+        """Perform a single API request and decode the response
+
+        Args:
+            method: The HTTP method
+            endpoint: The API endpoint to request
+            json_data: Data to be sent in JSON format
+            data: Data to be sent in application/x-www-form-urlencoded format
+            authorized: If the request requires an Authorization header
+            download: If we are downloading raw data
+        Returns:
+            The JSON response from the API or the raw data (if `download` is set)
+
+        """
+        r = self._request(
+            method,
+            endpoint,
+            json_data=json_data,
+            data=data,
+            authorized=authorized,
+            download=download,
+        )
         if r.status_code == 404:
             raise NotFoundException
         if download:
@@ -151,6 +306,155 @@ class HTBClient:
         else:
             return r.json()
 
+    def _request(
+        self,
+        method,
+        endpoint,
+        json_data=None,
+        data=None,
+        authorized=True,
+        download=False,
+        headers=None,
+    ) -> requests.Response:
+        """Send a request, waiting on the rate limiter and retrying while rate limited
+
+        Args:
+            method: The HTTP method
+            endpoint: The API endpoint to request
+            json_data: Data to be sent in JSON format
+            data: Data to be sent in application/x-www-form-urlencoded format
+            authorized: If the request requires an Authorization header
+            download: If we are downloading raw data
+            headers: Extra headers for this request only
+        Returns:
+            The raw response
+
+        """
+        if self._cassette is not None and self._cassette.replaying:
+            # Counted like a real exchange, so metrics and request budgets work on replays
+            start = time.perf_counter()
+            r = self._cassette.play(method, endpoint, json_data, data)
+            self._metrics.observe(
+                endpoint, r.status_code, time.perf_counter() - start, len(r.content)
+            )
+            return r
+        headers = dict(headers or {})
+        if authorized:
+            self._authorize()
+        else:
+            # Drop the session-wide Authorization header for this request only
+            headers["Authorization"] = None
+        attempt = 0
+        while True:
+            self._rate_limiter.wait(endpoint)
+            start = time.perf_counter()
+            r = self._session.request(
+                method,
+                self._api_base + endpoint,
+                json=json_data,
+                data=data,
+                headers=headers,
+                stream=download,
+            )
+            # Streamed bodies haven't been read yet, so trust the header
+            size = (
+                int(r.headers.get("Content-Length", 0)) if download else len(r.content)
+            )
+            self._metrics.observe(
+                endpoint, r.status_code, time.perf_counter() - start, size
+            )
+            self._rate_limiter.update(endpoint, r.status_code, r.headers)
+            if r.status_code != 429:
+                if self._cassette is not None:
+                    self._cassette.record(method, endpoint, r, json_data, data)
+                return r
+            if attempt >= self._rate_limiter.max_retries:
+                raise TooManyRequestsException(
+                    f"Still rate limited after {attempt} retries: {endpoint}"
+                )
+            # The next wait() sleeps until the backoff has passed
+            self._rate_limiter.backoff(endpoint, attempt, r.headers.get("Retry-After"))
+            self._metrics.retry(endpoint)
+            attempt += 1
+
+    def _submit(self, func: Callable, *args, **kwargs) -> Future:
+        """Run a call on the client's worker threads, started on first use
+
+        The pool is the size of the connection pool, so concurrent calls never wait on a
+        connection.
+        """
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._pool_size, thread_name_prefix="htb-client"
+                )
+        return self._executor.submit(func, *args, **kwargs)
+
+    def hydrate(
+        self,
+        objects: Iterable["HTBObject"],
+        attrs: Optional[Iterable[str]] = None,
+        max_workers: Optional[int] = None,
+    ) -> List["HTBObject"]:
+        """Fill in the detailed attributes of many summary objects at once
+
+        Reading a detailed attribute of a summary fetches the full object there and then,
+        so a loop over a list of summaries sends one request after another. This fetches
+        them concurrently instead, and fills the objects in place.
+
+        Args:
+            objects: The objects to hydrate. Detailed objects are left alone.
+            attrs: The detailed attributes needed. Summaries which already have all of
+                   them are left alone; by default every summary is hydrated.
+            max_workers: The number of objects fetched at once; by default the size of
+                         the connection pool
+
+        Returns: The same objects, in order
+
+        Raises:
+            Whatever the first failed fetch raised, once the others have finished
+
+        """
+        objects = list(objects)
+        if attrs is not None:
+            attrs = tuple(attrs)
+        pending = [obj for obj in objects if obj._needs_hydrating(attrs)]
+        if len(pending) == 1:
+            pending[0]._hydrate()
+        elif pending:
+            workers = min(max_workers or self._pool_size, len(pending))
+            with ThreadPoolExecutor(workers, thread_name_prefix="htb-hydrate") as pool:
+                for _ in pool.map(lambda obj: obj._hydrate(), pending):
+                    pass
+        return objects
+
+    def metrics(self) -> dict:
+        """Collect the request metrics of this client
+
+        Returns:
+            Per-endpoint-template metrics under ``endpoints``, plus the totals of the
+            single-flight layer, identity map and response cache. See `hackthebox.metrics`
+            for rendering them as Prometheus text.
+
+        """
+        metrics = {
+            "endpoints": self._metrics.snapshot(),
+            "singleflight": self._singleflight.stats(),
+            "identity_map": {
+                "hits": self._objects.hits,
+                "misses": self._objects.misses,
+            },
+        }
+        if self._response_cache is not None:
+            metrics["response_cache"] = self._response_cache.stats()
+        return metrics
+
+    def singleflight_stats(self) -> dict:
+        """
+        Returns: How many GET requests were sent and how many were served by a concurrent identical request
+        """
+        return self._singleflight.stats()
+
     def __init__(
         self,
         email: Optional[str] = None,
@@ -160,6 +464,13 @@ class HTBClient:
         api_base: str = API_BASE,
         remember: Optional[bool] = False,
         app_token: Optional[str] = None,
+        pool_size: int = POOL_SIZE,
+        rate_limiter: Optional[RateLimiter] = None,
+        response_cache: Optional[ResponseCache] = None,
+        identity_map: Optional[IdentityMap] = None,
+        cassette: Optional[Cassette] = None,
+        listing_ttl: float = MACHINE_LISTING_TTL,
+        connections_ttl: float = CONNECTIONS_TTL,
     ):
         """
         Authenticates to the API.
@@ -175,8 +486,34 @@ class HTBClient:
             cache: The path to load/store access tokens from/to
             remember: Whether to create a long-lasting 'remember me' token
             app_token: Authenticate using a provided App Token
+            pool_size: The maximum number of keep-alive connections held open to the API
+            rate_limiter: The `RateLimiter` to throttle requests with. Pass the same one to
+                          several clients to share a budget.
+            response_cache: A `ResponseCache` to serve repeated GET requests from
+            identity_map: The `IdentityMap` holding the Machines, Users, Challenges and Teams
+                          already fetched, so repeated lookups return the same instance
+            cassette: A `Cassette` to record every exchange to, or to replay them from
+                      instead of the network
+            listing_ttl: The number of seconds a `MachineListing` snapshot of the active
+                         machines is reused for
+            connections_ttl: The number of seconds a `Connections` snapshot of the VPN
+                             connection state is reused for
         """
         self._api_base = api_base
+        self._session = self._build_session(pool_size)
+        self._pool_size = pool_size
+        self._executor_lock = threading.Lock()
+        self._token_lock = threading.Lock()
+        self._rate_limiter = rate_limiter or RateLimiter()
+        self._singleflight = SingleFlight()
+        self._response_cache = response_cache
+        self._objects = identity_map or IdentityMap()
+        self._metrics = Metrics()
+        self._cassette = cassette
+        self._listing_ttl = listing_ttl
+        self._listing_lock = threading.Lock()
+        self._connections_ttl = connections_ttl
+        self._connections_lock = threading.Lock()
         if cache is not None:
             if self.load_from_cache(cache) is False:
                 self.do_login(email, password, otp, remember, app_token)
@@ -186,6 +523,15 @@ class HTBClient:
         else:
             self.do_login(email, password, otp, remember, app_token)
 
+    def close(self):
+        """Close every pooled connection held by the client and save any recording cassette"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._session.close()
+        if self._cassette is not None:
+            self._cassette.save()
+
     def load_from_cache(self, cache: str) -> bool:
         """
         Args:
@@ -305,8 +651,14 @@ class HTBClient:
         """
         from .machine import Machine
 
+        machine = self._objects.get(Machine, machine_id)
+        if machine is not None:
+            return machine
         data = cast(dict, self.do_request(f"machine/profile/{machine_id}"))["info"]
-        return Machine(data, self)
+        machine = self._objects.add(Machine(data, self), data["name"])
+        if machine.retired and self._response_cache is not None:
+            self._response_cache.mark_retired([machine.id])
+        return machine
 
     def get_tags_machine(self, machine_id: int | str) -> "Machine":
         """
@@ -351,6 +703,173 @@ class HTBClient:
         return data     
 
 
+    # noinspection PyUnresolvedReferences
+    def get_machine_bundle(self, machine_id: int | str) -> "MachineBundle":
+        """Fetch a machine's profile, tags, matrix and difficulty rating concurrently
+
+        The tags, matrix and rating only need the machine's ID, so when it is given (or the
+        machine has been fetched before) all four requests are sent at once. Given an unseen
+        name, the profile is fetched first to learn the ID.
+
+        The tags and rating are extras: if either request fails it is left as an empty list
+        rather than failing the whole bundle.
+
+        Args:
+            machine_id: The platform ID or name of the `Machine` to fetch
+
+        Returns: A `MachineBundle` of the four
+
+        """
+        from .machine import Machine, MachineBundle
+
+        machine = self._objects.get(Machine, machine_id)
+        listing = self._listing
+        if machine is not None:
+            ident = machine.id
+        elif isinstance(machine_id, int) or str(machine_id).isdigit():
+            ident = int(machine_id)
+            machine = self._submit(self.get_machine, ident)
+        elif listing is not None and listing.fresh and machine_id in listing:
+            ident = cast(dict, listing.get(machine_id))["id"]
+            machine = self._submit(self.get_machine, ident)
+        else:
+            machine = self.get_machine(machine_id)
+            ident = machine.id
+        tags = self._submit(self.get_tags_machine, ident)
+        matrix = self._submit(self.get_matrix, ident)
+        rating = self._submit(self.get_user_rating, ident)
+        if isinstance(machine, Future):
+            machine = machine.result()
+        return MachineBundle(
+            machine, _result_or_empty(tags), matrix.result(), _result_or_empty(rating)
+        )
+
+    def get_machine_listing(self, refresh: bool = False) -> MachineListing:
+        """The active machines, from a snapshot of ``machine/list`` shared by the client
+
+        The snapshot is fetched on first use and again once it is older than the client's
+        `listing_ttl`. Fetching the active list with `get_machines` refreshes it too.
+
+        Args:
+            refresh: Fetch a new snapshot even if the current one (or the response cache's
+                     copy of ``machine/list``) is fresh
+
+        Returns: The `MachineListing`, indexed by machine ID and name
+
+        """
+        with self._listing_lock:
+            listing = self._listing
+            if refresh or listing is None or not listing.fresh:
+                if refresh and self._response_cache is not None:
+                    self._response_cache.expire(["machine/list"])
+                data = cast(dict, self.do_request("machine/list"))["info"]
+                listing = self._listing = MachineListing(data, self._listing_ttl)
+            return listing
+
+    def is_machine_active(self, machine_id: int | str) -> bool:
+        """
+        Args:
+            machine_id: The platform ID or name of a `Machine`
+
+        Returns: Whether the machine is on the active list
+
+        """
+        return machine_id in self.get_machine_listing()
+
+    def get_connections(self, refresh: bool = False) -> Connections:
+        """The VPN connection state, from a snapshot of ``connections`` the client shares
+
+        The snapshot is fetched on first use and again once it is older than the
+        client's `connections_ttl`, or after switching server or spawning or stopping a
+        machine.
+
+        Args:
+            refresh: Fetch a new snapshot even if the current one is fresh
+
+        Returns: The `Connections` snapshot
+
+        """
+        with self._connections_lock:
+            connections = self._fresh_connections(refresh)
+            if connections.data is None:
+                connections.data = cast(dict, self.do_request("connections"))["data"]
+            return connections
+
+    def _fresh_connections(self, refresh: bool = False) -> Connections:
+        """The current snapshot, replaced by an empty one if stale. Hold the lock."""
+        connections = self._connections
+        if refresh or connections is None or not connections.fresh:
+            connections = self._connections = Connections(self._connections_ttl)
+        return connections
+
+    def _connection_servers(self, product: str) -> dict:
+        """The servers of ``labs`` or ``release_arena``, kept in the snapshot"""
+        with self._connections_lock:
+            connections = self._fresh_connections()
+            servers = connections.servers.get(product)
+            if servers is None:
+                servers = cast(
+                    dict, self.do_request(f"connections/servers?product={product}")
+                )["data"]
+                connections.servers[product] = servers
+            return servers
+
+    def _invalidate_connections(self):
+        """Drop the connections snapshot after an action changed the connection state"""
+        self._connections = None
+
+    def _invalidate_machine_listing(self):
+        """Drop the listing snapshot after spawning or stopping a machine changes its IP"""
+        self._listing = None
+        if self._response_cache is not None:
+            self._response_cache.expire(["machine/list"])
+
+    def invalidate_machine(self, machine_id: int, name: Optional[str] = None):
+        """Make the next fetch of a machine ask the API for everything again
+
+        The `Machine` is dropped from the identity map, and its cached profile, tags, matrix
+        and difficulty rating are marked stale so they are revalidated.
+
+        Args:
+            machine_id: The platform ID of the `Machine`
+            name: The machine's name, if its profile may have been fetched by name
+        """
+        from .machine import Machine
+
+        machine = self._objects.get(Machine, machine_id)
+        if machine is not None:
+            self._objects.discard(machine)
+        if self._response_cache is not None:
+            endpoints = [
+                f"machine/profile/{machine_id}",
+                f"machine/tags/{machine_id}",
+                f"machine/graph/matrix/{machine_id}",
+                f"machine/graph/owns/difficulty/{machine_id}",
+            ]
+            if name is not None:
+                endpoints.append(f"machine/profile/{name}")
+            self._response_cache.expire(endpoints)
+
+    def invalidate_challenge(self, challenge_id: int, name: Optional[str] = None):
+        """Make the next fetch of a challenge ask the API again
+
+        The `Challenge` is dropped from the identity map and its cached info marked stale.
+
+        Args:
+            challenge_id: The platform ID of the `Challenge`
+            name: The challenge's name, if its info may have been fetched by name
+        """
+        from .challenge import Challenge
+
+        challenge = self._objects.get(Challenge, challenge_id)
+        if challenge is not None:
+            self._objects.discard(challenge)
+        if self._response_cache is not None:
+            endpoints = [f"challenge/info/{challenge_id}"]
+            if name is not None:
+                endpoints.append(f"challenge/info/{name}")
+            self._response_cache.expire(endpoints)
+
     # noinspection PyUnresolvedReferences
     def get_todo_machines(self, limit: int = None) -> List[int]:
         """
@@ -377,20 +896,67 @@ class HTBClient:
         Returns: The `Machine` currently assigned (or active) to user
 
         """
-        from .machine import Machine, MachineInstance
+        from .machine import MachineInstance
 
         if release_arena:
             info = cast(dict, self.do_request(f"release_arena/active"))["info"]
         else:
             info = cast(dict, self.do_request(f"machine/active"))["info"]
         if info:
-            box = self.get_machine(info["id"])
-            server = box._client.get_current_vpn_server(release_arena)
-            return MachineInstance(box.ip, server, box, box._client)
+            box = self._submit(self.get_machine, info["id"])
+            server = self.get_current_vpn_server(release_arena)
+            box = box.result()
+            return MachineInstance(info.get("ip") or box.ip, server, box, self)
         return None
 
+    def get_active_session(self) -> "ActiveSession":
+        """Fetch everything the user has running at once
+
+        The active lab and Release Arena machines and the connection state are requested
+        concurrently, then the machines and the Release Arena server, also concurrently.
+
+        Returns: An `ActiveSession`
+
+        """
+        from .connections import ActiveSession
+        from .machine import MachineInstance
+        from .vpn import VPNServer
+
+        lab = self._submit(self.do_request, "machine/active")
+        arena = self._submit(self.do_request, "release_arena/active")
+        connections = self.get_connections()
+        lab_info = cast(dict, lab.result())["info"]
+        arena_info = cast(dict, arena.result())["info"]
+
+        lab_box = self._submit(self.get_machine, lab_info["id"]) if lab_info else None
+        arena_box = (
+            self._submit(self.get_machine, arena_info["id"]) if arena_info else None
+        )
+        arena_server = self.get_current_vpn_server(True) if arena_info else None
+        lab_server = connections.lab_server
+        lab_server = VPNServer(lab_server, self) if lab_server else None
+
+        machine = release_arena = None
+        if lab_box is not None:
+            box = lab_box.result()
+            ip = lab_info.get("ip") or box.ip
+            machine = MachineInstance(ip, cast(VPNServer, lab_server), box, self)
+        if arena_box is not None:
+            box = arena_box.result()
+            ip = arena_info.get("ip") or box.ip
+            release_arena = MachineInstance(
+                ip, cast(VPNServer, arena_server), box, self
+            )
+        return ActiveSession(connections, lab_server, machine, release_arena)
+
     # noinspection PyUnresolvedReferences
-    def get_machines(self, limit: int = None, retired: bool = False) -> List["Machine"]:
+    def get_machines(
+        self,
+        limit: int = None,
+        retired: bool = False,
+        prefetch: bool = False,
+        refresh: bool = False,
+    ) -> List["Machine"]:
         """
 
         Retrieve a list of `Machine` from the API
@@ -398,19 +964,31 @@ class HTBClient:
         Args:
             limit: The maximum number to fetch
             retired: Whether to fetch from the retired list instead of the active list
+            prefetch: Whether to fetch every `Machine` in full, concurrently (see `hydrate`)
+            refresh: Revalidate the list even if the response cache holds a fresh copy
 
         Returns: A list of `Machine`
 
         """
         from .machine import Machine
 
+        if refresh and self._response_cache is not None:
+            self._response_cache.expire(
+                ["machine/list/retired" if retired else "machine/list"]
+            )
         if not retired:
-            data = cast(dict, self.do_request("machine/list"))["info"][:limit]
+            data = cast(dict, self.do_request("machine/list"))["info"]
+            self._listing = MachineListing(data, self._listing_ttl)
+            data = data[:limit]
         else:
             data = cast(dict, self.do_request("machine/list/retired"))["info"][:limit]
         machines = [Machine(m, self, summary=True) for m in data]
         for machine in machines:
             machine.retired = retired
+        if retired and self._response_cache is not None:
+            self._response_cache.mark_retired(machine.id for machine in machines)
+        if prefetch:
+            self.hydrate(machines)
         return machines
 
     # noinspection PyUnresolvedReferences
@@ -425,18 +1003,25 @@ class HTBClient:
         """
         from .challenge import Challenge
 
+        challenge = self._objects.get(Challenge, challenge_id)
+        if challenge is not None:
+            return challenge
         data = cast(dict, self.do_request(f"challenge/info/{challenge_id}"))[
             "challenge"
         ]
-        return Challenge(data, self)
+        return self._objects.add(Challenge(data, self), data["name"])
 
     # noinspection PyUnresolvedReferences
-    def get_challenges(self, limit=None, retired=False) -> List["Challenge"]:
+    def get_challenges(
+        self, limit=None, retired=False, prefetch: bool = False
+    ) -> List["Challenge"]:
         """Requests a list of `Challenge` from the API
 
         Args:
             limit: The maximum number of `Challenge` to fetch
             retired: Whether to fetch from the retired list instead of the active list
+            prefetch: Whether to fetch every `Challenge` in full, concurrently (see
+                      `hydrate`)
 
         Returns: A list of `Challenge`
 
@@ -450,6 +1035,8 @@ class HTBClient:
         challenges = []
         for challenge in data["challenges"][:limit]:
             challenges.append(Challenge(challenge, self, summary=True))
+        if prefetch:
+            self.hydrate(challenges)
         return challenges
 
     # noinspection PyUnresolvedReferences
@@ -532,8 +1119,11 @@ class HTBClient:
         """
         from .user import User
 
+        user = self._objects.get(User, user_id)
+        if user is not None:
+            return user
         data = cast(dict, self.do_request(f"user/profile/basic/{user_id}"))["profile"]
-        return User(data, self)
+        return self._objects.add(User(data, self))
 
     # noinspection PyUnresolvedReferences
     def get_team(self, team_id: int) -> "Team":
@@ -547,12 +1137,19 @@ class HTBClient:
         """
         from .team import Team
 
+        team = self._objects.get(Team, team_id)
+        if team is not None:
+            return team
         data = cast(dict, self.do_request(f"team/info/{team_id}"))
-        return Team(data, self)
+        return self._objects.add(Team(data, self))
 
     # noinspection PyUnresolvedReferences
-    def get_hof(self, vip: bool = False) -> "Leaderboard":
+    def get_hof(self, vip: bool = False, prefetch: bool = False) -> "Leaderboard":
         """
+        Args:
+            vip: Whether to fetch the VIP leaderboard
+            prefetch: Whether to fetch every `User` in full, concurrently (see `hydrate`)
+
         Returns: A Leaderboard of the top 100 Users
         """
         from .leaderboard import Leaderboard
@@ -562,7 +1159,10 @@ class HTBClient:
         if vip:
             endpoint += "?vip=1"
         data = cast(dict, self.do_request(endpoint))["data"]
-        return Leaderboard(data, self, User)
+        leaderboard = Leaderboard(data, self, User)
+        if prefetch:
+            self.hydrate(leaderboard)
+        return leaderboard
 
     # noinspection PyUnresolvedReferences
     def get_hof_countries(self) -> "Leaderboard":
@@ -609,13 +1209,9 @@ class HTBClient:
         from .vpn import VPNServer
 
         if release_arena:
-            connections = cast(
-                dict, self.do_request("connections/servers?product=release_arena")
-            )["data"]
-            data = connections["assigned"]
+            data = self._connection_servers("release_arena")["assigned"]
         else:
-            connections = cast(dict, self.do_request("connections"))["data"]
-            data = connections["lab"]["assigned_server"]
+            data = self.get_connections().lab_server
 
         return VPNServer(data, self)
 
@@ -629,14 +1225,9 @@ class HTBClient:
         """
         from .vpn import VPNServer
 
-        if release_arena:
-            data = cast(
-                dict, self.do_request("connections/servers?product=release_arena")
-            )["data"]["options"]
-        else:
-            data = cast(dict, self.do_request("connections/servers?product=labs"))[
-                "data"
-            ]["options"]
+        data = self._connection_servers("release_arena" if release_arena else "labs")[
+            "options"
+        ]
         servers = []
         for location in data.keys():  # 'EU'
             for location_role in data[location].keys():  # 'EU - Free'
@@ -661,17 +1252,28 @@ class HTBClient:
 class HTBObject:
     """Base class of all API objects
 
+    Subclasses declare their attributes in `__slots__`, since a full catalog or leaderboard
+    holds thousands of them. An unset slot raises `AttributeError` like a missing key of
+    `__dict__` would, so `__getattr__` still fills in detailed attributes on demand.
+
     Attributes:
         id: The ID of the associated object
     """
 
+    __slots__ = ("_client", "_is_summary", "id")
+
     _client: HTBClient
     # Attributes not fetched by a summary
-    _detailed_attributes: Tuple[str, ...]
-    _detailed_func: Callable[..., Any]
-    _is_summary: bool = False
+    _detailed_attributes: Tuple[str, ...] = ()
+    # The `HTBClient` method fetching the full object by ID
+    _detailed_method: str
+    _is_summary: bool
     id: int
 
+    def __init__(self, client: HTBClient, summary: bool = False):
+        self._client = client
+        self._is_summary = summary
+
     def __getattr__(self, item):
         """Retrieve attributes not given when initialised from a summary
 
@@ -684,13 +1286,46 @@ class HTBObject:
 
         """
         if item in self._detailed_attributes and self._is_summary:
-            new_obj = self._detailed_func(self.id)
-            for attr in self._detailed_attributes:
-                setattr(self, attr, getattr(new_obj, attr))
-            self._is_summary = False
-            return getattr(new_obj, item)
+            self._hydrate()
+            return getattr(self, item)
         else:
             raise AttributeError
 
+    def _needs_hydrating(self, attrs: Optional[Iterable[str]] = None) -> bool:
+        """Whether this is a summary without some of `attrs` (by default, of any detail)"""
+        if not self._is_summary:
+            return False
+        if attrs is None:
+            return True
+        for attr in attrs:
+            if attr not in self._detailed_attributes:
+                continue
+            try:
+                # Bypasses __getattr__, which would hydrate
+                object.__getattribute__(self, attr)
+            except AttributeError:
+                return True
+        return False
+
+    def _hydrate(self):
+        """Request the full object from the API and copy its detailed attributes onto this one
+
+        Attributes the full object doesn't have either, such as `Machine.user_own_time` of a
+        machine the user hasn't owned, are left unset.
+        """
+        new_obj = getattr(self._client, self._detailed_method)(self.id)
+        for attr in self._detailed_attributes:
+            try:
+                value = object.__getattribute__(new_obj, attr)
+            except AttributeError:
+                continue
+            setattr(self, attr, value)
+        self._is_summary = False
+
     def __eq__(self, other):
+        if not isinstance(other, HTBObject):
+            return NotImplemented
         return self.id == other.id and type(self) == type(other)
+
+    def __hash__(self):
+        return hash((type(self), self.id))
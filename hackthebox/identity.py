@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple, Type
+
+from .utils import normalise_ident
+
+
+class IdentityMap:
+    """A bounded, expiring map of (type, ID) to the one instance of each fetched object
+
+    Objects can also be registered under aliases (such as a Machine's name), so a lookup by
+    name and a lookup by ID return the same instance.
+
+    Args:
+        max_size: The number of keys kept before the least recently used are dropped
+        ttl: The number of seconds an object is handed out before it is fetched again
+
+    Attributes:
+        hits: Lookups answered by the map
+        misses: Lookups that had to be fetched
+
+    """
+
+    max_size: int
+    ttl: float
+    hits: int
+    misses: int
+    _items: "OrderedDict[Tuple[type, Hashable], Tuple[float, Any]]"
+    _lock: threading.Lock
+
+    def __init__(self, max_size: int = 1024, ttl: float = 300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, cls: Type, ident: int | str) -> Optional[Any]:
+        """
+        Args:
+            cls: The type of object
+            ident: The ID or alias of the object
+
+        Returns: The live instance, or None if it isn't known or has expired
+
+        """
+        key = (cls, normalise_ident(ident))
+        with self._lock:
+            item = self._items.get(key)
+            if item is None or item[0] < time.monotonic():
+                if item is not None:
+                    del self._items[key]
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def add(self, obj: Any, *aliases: str) -> Any:
+        """Register a freshly fetched object
+
+        If a live instance with the same ID is already registered (for example, fetched
+        concurrently by another thread) that instance is kept and returned instead.
+
+        Args:
+            obj: The object, which must have an `id`
+            *aliases: Other identifiers the object may be looked up by
+
+        Returns: The canonical instance
+
+        """
+        cls = type(obj)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._items.get((cls, obj.id))
+            if entry is None or entry[0] < now:
+                entry = (now + self.ttl, obj)
+            for ident in (entry[1].id, *aliases):
+                key = (cls, normalise_ident(ident))
+                self._items[key] = entry
+                self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+        return entry[1]
+
+    def discard(self, obj: Any):
+        """Forget an object under every key it was registered with"""
+        with self._lock:
+            for key in [k for k, (_, o) in self._items.items() if o is obj]:
+                del self._items[key]
+
+    def clear(self):
+        """Forget every object"""
+        with self._lock:
+            self._items.clear()
@@ -0,0 +1,65 @@
+"""
+A short-lived snapshot of the active machine list, indexed by ID and by name.
+
+``machine/list`` is the only place the API gives the IP of every active machine, and being
+in it is what makes a machine active. `HTBClient.get_machine_listing` keeps one snapshot of
+it for a minute or so, so `Machine.ip`, name lookups and activity checks are dictionary
+lookups instead of a download and a scan of the whole list each.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Dict, Hashable, List, Optional
+
+from .utils import normalise_ident
+
+
+class MachineListing:
+    """The entries of ``machine/list`` at one point in time
+
+    Args:
+        entries: The ``info`` list of the response
+        ttl: The number of seconds the snapshot is considered fresh
+
+    Attributes:
+        entries: The raw machine entries, in the order the API listed them
+        expires: When the snapshot stops being fresh, on the `time.monotonic` clock
+
+    """
+
+    entries: List[dict]
+    expires: float
+    _index: Dict[Hashable, dict]
+
+    def __init__(self, entries: List[dict], ttl: float):
+        self.entries = entries
+        self.expires = time.monotonic() + ttl
+        self._index = {}
+        for entry in entries:
+            self._index[entry["id"]] = entry
+            self._index[entry["name"].lower()] = entry
+
+    @property
+    def fresh(self) -> bool:
+        """Whether the snapshot is younger than its TTL"""
+        return time.monotonic() < self.expires
+
+    def get(self, ident: int | str) -> Optional[dict]:
+        """
+        Args:
+            ident: The ID or name of a machine
+
+        Returns: The machine's entry, or None if it isn't an active machine
+
+        """
+        return self._index.get(normalise_ident(ident))
+
+    def __contains__(self, ident: int | str) -> bool:
+        return normalise_ident(ident) in self._index
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __repr__(self):
+        return f"<MachineListing {len(self.entries)} machines>"
@@ -1,8 +1,6 @@
 from datetime import datetime, timedelta
 from typing import List, Union, cast, Optional, TYPE_CHECKING
 
-import dateutil.parser
-
 from . import htb, vpn
 from .errors import (
     IncorrectArgumentException,
@@ -14,7 +12,7 @@ from .errors import (
     SolveError,
 )
 from .solve import MachineSolve
-from .utils import parse_delta
+from .utils import parse_datetime, parse_delta
 
 if TYPE_CHECKING:
     from .user import User
@@ -52,10 +50,41 @@ class Machine(htb.HTBObject):
         difficulty_ratings: A dict of difficulty ratings given
     """
 
+    __slots__ = (
+        "name",
+        "os",
+        "points",
+        "release_date",
+        "user_owns",
+        "root_owns",
+        "free",
+        "user_owned",
+        "root_owned",
+        "reviewed",
+        "stars",
+        "avatar",
+        "difficulty",
+        "active",
+        "retired",
+        "avg_difficulty",
+        "completed",
+        "user_own_time",
+        "root_own_time",
+        "user_blood",
+        "root_blood",
+        "user_blood_time",
+        "root_blood_time",
+        "difficulty_ratings",
+        "_authors",
+        "_author_ids",
+        "_ip",
+    )
+
     name: str
     os: str
     points: int
     release_date: datetime
+    user_owns: int
     root_owns: int
     free: bool
     user_owned: bool
@@ -65,6 +94,7 @@ class Machine(htb.HTBObject):
     avatar: str
     difficulty: str
 
+    _detailed_method = "get_machine"
     _detailed_attributes = (
         "active",
         "retired",
@@ -89,10 +119,9 @@ class Machine(htb.HTBObject):
     difficulty_ratings: dict
 
     # noinspection PyUnresolvedReferences
-    _authors: Optional[List["User"]] = None
+    _authors: Optional[List["User"]]
     _author_ids: List[int]
-    _is_release: Optional[bool] = None
-    _ip: Optional[str] = None
+    _ip: Optional[str]
 
     def submit(self, flag: str, difficulty: int) -> str:
         """Submits a flag for a Machine
@@ -123,6 +152,8 @@ class Machine(htb.HTBObject):
                 raise RootAlreadySubmitted
             else:
                 raise SolveError
+        # The own flags and times of every cached copy are out of date now
+        self._client.invalidate_machine(self.id, self.name)
         return submission["message"]
 
     # noinspection PyUnresolvedReferences
@@ -140,27 +171,18 @@ class Machine(htb.HTBObject):
         return self._authors
 
     @property
-    def is_release(self):
-        if self._is_release is not None:
-            return self._is_release
-        self._is_release = False
-
-        data = self._client.do_request("connections")["data"]
-        try:
-            if data["release_arena"]["machine"]["id"] == self.id:
-                self._is_release = True
-        except AttributeError:
-            pass
-        return self._is_release
+    def is_release(self) -> bool:
+        """Whether the Machine is on the Release Arena (see `HTBClient.get_connections`)"""
+        return self._client.get_connections().release_arena_machine_id == self.id
 
     @property
-    def ip(self):
-        """The IP of an active machine."""
+    def ip(self) -> Optional[str]:
+        """The IP of an active machine, or None if it isn't active or has none yet"""
         if self._ip is not None:
             return self._ip
-        listing = self._client.do_request("machine/list")["info"]
-        m = next(filter(lambda x: x["id"] == self.id, listing))
-        self._ip = m["ip"]
+        entry = self._client.get_machine_listing().get(self.id)
+        if entry is not None:
+            self._ip = entry.get("ip")
         return self._ip
 
     def start(self, release_arena=False) -> Union["MachineInstance", None]:
@@ -201,19 +223,23 @@ class Machine(htb.HTBObject):
                 server = self._client.get_current_vpn_server()
             else:
                 raise Exception(f"Failed to spawn: {data}")
+        self._ip = ip
+        self._client._invalidate_machine_listing()
+        self._client._invalidate_connections()
         return MachineInstance(ip, server, self, self._client)
 
     def __repr__(self):
         return f"<Machine '{self.name}'>"
 
     def __init__(self, data: dict, client: htb.HTBClient, summary: bool = False):
-        self._client = client
-        self._detailed_func = client.get_machine  # type: ignore
+        super().__init__(client, summary)
+        self._authors = None
+        self._ip = None
         self.id = data["id"]
         self.name = data["name"]
         self.os = data["os"]
         self.points = data["points"]
-        self.release_date = dateutil.parser.parse(data["release"])
+        self.release_date = parse_datetime(data["release"])
         self.user_owns = data["user_owns_count"]
         self.root_owns = data["root_owns_count"]
         self.user_owned = data["authUserInUserOwns"]
@@ -225,7 +251,6 @@ class Machine(htb.HTBObject):
         self.free = data["free"]
         self._author_ids = [data["maker"]["id"]]
 
-        
         if data.get("ip"):
             self._ip = data["ip"]
         if data["maker2"]:
@@ -240,7 +265,7 @@ class Machine(htb.HTBObject):
             self.difficulty_ratings = data["feedbackForChart"]
             if data["userBlood"]:
                 user_blood_data = {
-                    "date": dateutil.parser.parse(data["userBlood"]["created_at"]),
+                    "date": parse_datetime(data["userBlood"]["created_at"]),
                     "first_blood": True,
                     "id": data["id"],
                     "name": data["name"],
@@ -252,7 +277,7 @@ class Machine(htb.HTBObject):
                 )
             if data["rootBlood"]:
                 user_blood_data = {
-                    "date": dateutil.parser.parse(data["rootBlood"]["created_at"]),
+                    "date": parse_datetime(data["rootBlood"]["created_at"]),
                     "first_blood": True,
                     "id": data["id"],
                     "name": data["name"],
@@ -262,8 +287,32 @@ class Machine(htb.HTBObject):
                 self.root_blood_time = parse_delta(
                     data["rootBlood"]["blood_difference"]
                 )
-        else:
-            self._is_summary = True
+
+
+class MachineBundle:
+    """Everything needed to write up a Machine, fetched in one go by `HTBClient.get_machine_bundle`
+
+    Attributes:
+        machine: The Machine
+        tags: The Machine's tags
+        matrix: The maker, aggregate and user scores of the Machine
+        rating: The user and root owns per difficulty rating
+
+    """
+
+    machine: Machine
+    tags: List[dict]
+    matrix: dict
+    rating: dict
+
+    def __init__(self, machine: Machine, tags: List[dict], matrix: dict, rating: dict):
+        self.machine = machine
+        self.tags = tags
+        self.matrix = matrix
+        self.rating = rating
+
+    def __repr__(self):
+        return f"<MachineBundle '{self.machine.name}'>"
 
 
 class MachineInstance:
@@ -300,6 +349,9 @@ class MachineInstance:
             self.client.do_request(
                 "vm/terminate", json_data={"machine_id": self.machine.id}
             )
+        self.machine._ip = None
+        self.client._invalidate_machine_listing()
+        self.client._invalidate_connections()
 
         # Can't delete references to the object from here so we just have
         # to set everything to None and prevent further usage
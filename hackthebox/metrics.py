@@ -0,0 +1,220 @@
+"""
+Per-endpoint request metrics for `HTBClient`.
+
+Endpoints are grouped by template (``machine/profile/{id}`` rather than
+``machine/profile/Lame``), and for each template the client counts requests by status,
+retries, cache hits, deduplicated requests and bytes received, and keeps a latency histogram.
+
+Examples:
+    Dumping the metrics of a client::
+
+        print(to_prometheus(client.metrics()))
+        json.dump(client.metrics(), open("metrics.json", "w"))
+
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Dict, List, Tuple
+
+# Upper bounds, in seconds, of the latency histogram buckets
+LATENCY_BUCKETS: Tuple[float, ...] = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Endpoints whose last path segment is an ID or a name
+_ID_PREFIXES: Tuple[str, ...] = (
+    "machine/profile/",
+    "machine/tags/",
+    "machine/graph/matrix/",
+    "machine/graph/owns/difficulty/",
+    "challenge/info/",
+    "challenge/download/",
+    "user/profile/basic/",
+    "user/profile/activity/",
+    "user/profile/content/",
+    "team/info/",
+    "team/stats/owns/",
+)
+
+
+def endpoint_template(endpoint: str) -> str:
+    """Replace the variable parts of an endpoint so requests to the same route are grouped
+
+    Args:
+        endpoint: The API endpoint, relative to the API base
+
+    Returns:
+        The endpoint template, e.g. ``machine/profile/{id}``
+
+    """
+    path = endpoint.split("?", 1)[0]
+    for prefix in _ID_PREFIXES:
+        if path.startswith(prefix) and "/" not in path[len(prefix) :]:
+            return prefix + "{id}"
+    return "/".join("{id}" if part.isdigit() else part for part in path.split("/"))
+
+
+class _EndpointStats:
+    """Counters for one endpoint template"""
+
+    statuses: Dict[str, int]
+    latency_buckets: List[int]
+    latency_sum: float
+    bytes: int
+    retries: int
+    cache_hits: int
+    deduplicated: int
+
+    def __init__(self):
+        self.statuses = {}
+        self.latency_buckets = [0] * len(LATENCY_BUCKETS)
+        self.latency_sum = 0.0
+        self.bytes = self.retries = self.cache_hits = self.deduplicated = 0
+
+    def snapshot(self) -> dict:
+        requests = sum(self.statuses.values())
+        server_errors = sum(n for s, n in self.statuses.items() if s.startswith("5"))
+        return {
+            "requests": requests,
+            "statuses": dict(self.statuses),
+            "not_found": self.statuses.get("404", 0),
+            "rate_limited": self.statuses.get("429", 0),
+            "server_errors": server_errors,
+            "retries": self.retries,
+            "cache_hits": self.cache_hits,
+            "deduplicated": self.deduplicated,
+            "bytes": self.bytes,
+            "latency": {
+                "count": requests,
+                "sum": self.latency_sum,
+                "buckets": dict(zip(map(str, LATENCY_BUCKETS), self.latency_buckets)),
+            },
+        }
+
+
+class Metrics:
+    """Thread-safe request metrics, grouped by endpoint template"""
+
+    _endpoints: Dict[str, _EndpointStats]
+    _lock: threading.Lock
+
+    def __init__(self):
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def _stats(self, endpoint: str) -> _EndpointStats:
+        template = endpoint_template(endpoint)
+        stats = self._endpoints.get(template)
+        if stats is None:
+            stats = self._endpoints[template] = _EndpointStats()
+        return stats
+
+    def observe(self, endpoint: str, status: int, seconds: float, size: int):
+        """Record a response received from the API
+
+        Args:
+            endpoint: The endpoint requested
+            status: The HTTP status of the response
+            seconds: How long the request took
+            size: The number of body bytes received
+
+        """
+        with self._lock:
+            stats = self._stats(endpoint)
+            key = str(status)
+            stats.statuses[key] = stats.statuses.get(key, 0) + 1
+            stats.latency_sum += seconds
+            # Buckets are cumulative, as in Prometheus
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    stats.latency_buckets[i] += 1
+            stats.bytes += size
+
+    def retry(self, endpoint: str):
+        """Record a request being retried after a 429"""
+        with self._lock:
+            self._stats(endpoint).retries += 1
+
+    def cache_hit(self, endpoint: str):
+        """Record a request answered from the response cache"""
+        with self._lock:
+            self._stats(endpoint).cache_hits += 1
+
+    def deduplicated(self, endpoint: str):
+        """Record a request answered by an identical request already in flight"""
+        with self._lock:
+            self._stats(endpoint).deduplicated += 1
+
+    def snapshot(self) -> Dict[str, dict]:
+        """
+        Returns: The metrics of every endpoint template, keyed by template
+        """
+        with self._lock:
+            return {
+                template: stats.snapshot()
+                for template, stats in sorted(self._endpoints.items())
+            }
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def to_prometheus(metrics: dict) -> str:
+    """Render the output of `HTBClient.metrics()` in the Prometheus text exposition format
+
+    Args:
+        metrics: A metrics dict from `HTBClient.metrics()`
+
+    Returns:
+        The metrics as Prometheus text
+
+    """
+    endpoints = metrics["endpoints"]
+    lines = [
+        "# HELP htb_requests_total API responses received, by status",
+        "# TYPE htb_requests_total counter",
+    ]
+    for template, stats in endpoints.items():
+        for status, count in sorted(stats["statuses"].items()):
+            lines.append(
+                f'htb_requests_total{{endpoint="{_label(template)}",status="{status}"}} {count}'
+            )
+    counters = (
+        ("retries", "Requests retried after a 429"),
+        ("cache_hits", "Requests answered from the response cache"),
+        ("deduplicated", "Requests answered by an identical in-flight request"),
+        ("bytes", "Response body bytes received"),
+    )
+    for name, description in counters:
+        lines.append(f"# HELP htb_{name}_total {description}")
+        lines.append(f"# TYPE htb_{name}_total counter")
+        for template, stats in endpoints.items():
+            lines.append(
+                f'htb_{name}_total{{endpoint="{_label(template)}"}} {stats[name]}'
+            )
+    lines.append("# HELP htb_request_duration_seconds API request latency")
+    lines.append("# TYPE htb_request_duration_seconds histogram")
+    for template, stats in endpoints.items():
+        label = _label(template)
+        latency = stats["latency"]
+        for bound, count in latency["buckets"].items():
+            lines.append(
+                f'htb_request_duration_seconds_bucket{{endpoint="{label}",le="{bound}"}} {count}'
+            )
+        lines.append(
+            f'htb_request_duration_seconds_bucket{{endpoint="{label}",le="+Inf"}} {latency["count"]}'
+        )
+        lines.append(
+            f'htb_request_duration_seconds_sum{{endpoint="{label}"}} {latency["sum"]}'
+        )
+        lines.append(
+            f'htb_request_duration_seconds_count{{endpoint="{label}"}} {latency["count"]}'
+        )
+    for section, values in metrics.items():
+        if section == "endpoints":
+            continue
+        for name, value in values.items():
+            lines.append(f"# TYPE htb_{section}_{name} gauge")
+            lines.append(f"htb_{section}_{name} {value}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,271 @@
+"""
+Client-side rate limiting for the API.
+
+Requests are grouped into endpoint classes, each with its own token bucket. Buckets are
+refilled continuously, so a caller that has to wait sleeps exactly as long as needed for its
+token instead of polling.
+
+The budgets are only where each class starts: the limiter searches for the highest rate the
+API tolerates the way TCP searches for bandwidth. While a class is using all of its rate,
+every successful response raises it, doubling it each second until the first 429 ("slow
+start") and by one request per second each second after that. A 429 halves the rate and
+blocks the class until the server's `Retry-After` (or a jittered exponential backoff) has
+passed. There is no fixed ceiling unless one is configured; ``X-RateLimit-*`` headers, when
+the API sends them, still stop a class the moment its window runs out.
+
+Examples:
+    Sharing one limiter between two clients::
+
+        limiter = RateLimiter(budgets={"default": (10, 20)}, max_retries=8)
+        client = HTBClient(app_token=token, rate_limiter=limiter)
+        other = HTBClient(app_token=other_token, rate_limiter=limiter)
+
+"""
+
+from __future__ import annotations
+
+import email.utils
+import math
+import random
+import threading
+import time
+from typing import Dict, Mapping, Optional, Tuple
+
+# (starting requests per second, burst size) for each endpoint class
+DEFAULT_BUDGETS: Dict[str, Tuple[float, float]] = {
+    "default": (8.0, 16.0),
+    "search": (2.0, 4.0),
+    "download": (0.5, 1.0),
+    "auth": (1.0, 2.0),
+}
+
+# Endpoint prefixes mapped to their class; anything else is "default"
+ENDPOINT_CLASSES: Tuple[Tuple[str, str], ...] = (
+    ("challenge/download/", "download"),
+    ("access/ovpnfile/", "download"),
+    ("search/", "search"),
+    ("login", "auth"),
+    ("2fa/", "auth"),
+)
+
+
+def endpoint_class(endpoint: str) -> str:
+    """Get the rate limit class of an endpoint
+
+    Args:
+        endpoint: The API endpoint, relative to the API base
+
+    Returns:
+        The name of the class whose budget the endpoint draws from
+
+    """
+    for prefix, name in ENDPOINT_CLASSES:
+        if endpoint.startswith(prefix):
+            return name
+    return "default"
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a `Retry-After` header given either as seconds or as an HTTP date
+
+    Args:
+        value: The raw header value
+
+    Returns:
+        The number of seconds to wait, or None if the header is missing or malformed
+
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, date.timestamp() - time.time())
+
+
+class TokenBucket:
+    """A token bucket which hands out reservations rather than refusing
+
+    Attributes:
+        rate: The current refill rate, in tokens per second
+        threshold: Half the rate of the last 429, above which the rate grows linearly
+                   instead of exponentially; None until the first 429
+        capacity: The maximum number of tokens the bucket can hold
+        blocked_until: Monotonic time before which no request may be sent
+        saturated_at: Monotonic time a reservation last had to wait for its token
+        decreased_at: Monotonic time the rate was last halved
+
+    """
+
+    rate: float
+    threshold: Optional[float] = None
+    capacity: float
+    blocked_until: float = 0.0
+    saturated_at: float = -math.inf
+    decreased_at: float = -math.inf
+    _tokens: float
+    _updated: float
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    def reserve(self, now: float) -> float:
+        """Take a token, going into debt if none are left
+
+        Args:
+            now: The current monotonic time
+
+        Returns:
+            How long the caller must wait before using its token
+
+        """
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+        self._tokens -= 1
+        wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            self.saturated_at = now
+        return max(wait, self.blocked_until - now)
+
+    def saturated(self, now: float) -> bool:
+        """Whether the rate, rather than the callers, has been the limit in the last second"""
+        return now - self.saturated_at < 1.0
+
+
+class RateLimiter:
+    """Token buckets per endpoint class, shared by every thread and task using a client
+
+    Args:
+        budgets: (starting requests per second, burst size) per endpoint class, merged over
+                 `DEFAULT_BUDGETS`
+        max_retries: How many times a request is retried after a 429 before giving up
+        backoff_base: The first backoff step, in seconds
+        backoff_cap: The longest backoff, in seconds
+        min_rate: The floor the adaptive rate never drops below
+        max_rate: A ceiling the adaptive rate never grows above, if any
+
+    """
+
+    max_retries: int
+    backoff_base: float
+    backoff_cap: float
+    min_rate: float
+    max_rate: Optional[float]
+    _buckets: Dict[str, TokenBucket]
+    _lock: threading.Lock
+
+    def __init__(
+        self,
+        budgets: Optional[Mapping[str, Tuple[float, float]]] = None,
+        max_retries: int = 5,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 30.0,
+        min_rate: float = 0.2,
+        max_rate: Optional[float] = None,
+    ):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self._buckets = {
+            name: TokenBucket(rate, burst)
+            for name, (rate, burst) in {**DEFAULT_BUDGETS, **(budgets or {})}.items()
+        }
+        self._lock = threading.Lock()
+
+    def _bucket(self, endpoint: str) -> TokenBucket:
+        return self._buckets.get(endpoint_class(endpoint)) or self._buckets["default"]
+
+    def reserve(self, endpoint: str) -> float:
+        """Reserve a request slot for an endpoint
+
+        Returns:
+            The number of seconds to wait before sending the request
+
+        """
+        with self._lock:
+            return self._bucket(endpoint).reserve(time.monotonic())
+
+    def wait(self, endpoint: str):
+        """Block the current thread until a request to `endpoint` may be sent"""
+        delay = self.reserve(endpoint)
+        if delay > 0:
+            time.sleep(delay)
+
+    def update(self, endpoint: str, status: int, headers: Mapping[str, str]):
+        """Adapt the budget of an endpoint's class to a response
+
+        Args:
+            endpoint: The endpoint that was requested
+            status: The HTTP status of the response
+            headers: The response headers
+
+        """
+        with self._lock:
+            bucket = self._bucket(endpoint)
+            now = time.monotonic()
+            remaining = headers.get("X-RateLimit-Remaining")
+            reset = headers.get("X-RateLimit-Reset")
+            if remaining is not None and reset is not None:
+                try:
+                    if int(remaining) <= 0:
+                        reset_in = float(reset)
+                        # Either an epoch timestamp or a number of seconds
+                        if reset_in > 1e9:
+                            reset_in -= time.time()
+                        bucket.blocked_until = max(bucket.blocked_until, now + reset_in)
+                except ValueError:
+                    pass
+            limit = headers.get("X-RateLimit-Limit")
+            if limit is not None and limit.isdigit() and int(limit) > 0:
+                bucket.capacity = min(bucket.capacity, float(limit))
+            if status == 429:
+                # Requests already in flight get the same answer; halve once for all of them
+                if now - bucket.decreased_at >= 1.0:
+                    bucket.rate = bucket.threshold = max(self.min_rate, bucket.rate / 2)
+                    bucket.decreased_at = now
+            elif status < 500 and bucket.saturated(now):
+                # A rate that callers don't use up says nothing about what the API allows
+                if bucket.threshold is None or bucket.rate < bucket.threshold:
+                    bucket.rate += 1
+                else:
+                    bucket.rate += 1 / bucket.rate
+                if self.max_rate is not None:
+                    bucket.rate = min(self.max_rate, bucket.rate)
+
+    def backoff(
+        self, endpoint: str, attempt: int, retry_after: Optional[str] = None
+    ) -> float:
+        """Hold back an endpoint's class after a 429
+
+        The delay is taken from `Retry-After` if the server sent one, otherwise it is an
+        exponential backoff with jitter. Every caller of the class waits it out in `wait`.
+
+        Args:
+            endpoint: The endpoint that was rate limited
+            attempt: How many retries have already been made
+            retry_after: The raw `Retry-After` header, if any
+
+        Returns:
+            The delay applied, in seconds
+
+        """
+        delay = parse_retry_after(retry_after)
+        if delay is None:
+            step = min(self.backoff_cap, self.backoff_base * 2**attempt)
+            delay = step / 2 + random.uniform(0, step / 2)
+        with self._lock:
+            bucket = self._bucket(endpoint)
+            bucket.blocked_until = max(bucket.blocked_until, time.monotonic() + delay)
+        return delay
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class _Call:
+    """An in-flight call that later callers can wait on"""
+
+    done: threading.Event
+    result: Any = None
+    error: Optional[BaseException] = None
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key into a single execution
+
+    The first caller for a key runs the function; anyone asking for the same key while it is
+    running blocks and receives the same result (or exception). Results are not kept once the
+    call finishes - this is deduplication, not caching.
+
+    Attributes:
+        executed: The number of calls that actually ran
+        deduplicated: The number of calls served by another caller's execution
+
+    """
+
+    executed: int
+    deduplicated: int
+    _calls: Dict[Hashable, _Call]
+    _lock: threading.Lock
+
+    def __init__(self):
+        self.executed = 0
+        self.deduplicated = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """Run `func`, or wait for the identical call already in flight
+
+        Args:
+            key: Identifies calls that are interchangeable
+            func: The call to make
+
+        Returns:
+            The result of `func`, shared with every concurrent caller of `key`
+
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+                leader = True
+            else:
+                self.deduplicated += 1
+                leader = False
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns: The number of executed and deduplicated calls so far
+        """
+        with self._lock:
+            return {"executed": self.executed, "deduplicated": self.deduplicated}
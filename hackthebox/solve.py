@@ -21,8 +21,10 @@ class Solve:
 
     """
 
+    __slots__ = ("_client", "_item", "id", "name", "date", "blood", "points")
+
     _client: "HTBClient"
-    _item: Optional["HTBObject"] = None  # The solved item
+    _item: Optional["HTBObject"]  # The solved item
     id: int
     name: str
     date: datetime
@@ -31,6 +33,7 @@ class Solve:
 
     def __init__(self, data: dict, client: "HTBClient"):
         self._client = client
+        self._item = None
         self.date = data["date"]
         self.blood = data["first_blood"]
         self.id = data["id"]
@@ -40,6 +43,8 @@ class Solve:
 class MachineSolve(Solve):
     """Representation of solving a Machine"""
 
+    __slots__ = ("type",)
+
     type: str  # User/Root
 
     def __repr__(self):
@@ -67,6 +72,8 @@ class MachineSolve(Solve):
 class ChallengeSolve(Solve):
     """Representation of solving a Challenge"""
 
+    __slots__ = ("category",)
+
     category: str
 
     def __repr__(self):
@@ -91,6 +98,8 @@ class ChallengeSolve(Solve):
 class EndgameSolve(Solve):
     """Representation of solving a Endgame"""
 
+    __slots__ = ("flag_name",)
+
     flag_name: str
 
     def __repr__(self):
@@ -115,6 +124,8 @@ class EndgameSolve(Solve):
 class FortressSolve(Solve):
     """Representation of solving a Fortress"""
 
+    __slots__ = ("flag_name",)
+
     flag_name: str
 
     def __repr__(self):
@@ -26,8 +26,29 @@ class Team(htb.HTBObject):
 
     """
 
+    __slots__ = (
+        "name",
+        "points",
+        "motto",
+        "description",
+        "country_name",
+        "avatar_url",
+        "cover_image_url",
+        "twitter",
+        "facebook",
+        "discord",
+        "public",
+        "can_delete_avatar",
+        "is_respected",
+        "join_request_sent",
+        "_captain",
+        "_captain_id",
+        "_ranking",
+    )
+
     name: str
 
+    _detailed_method = "get_team"
     _detailed_attributes = (
         "points",
         "motto",
@@ -40,7 +61,7 @@ class Team(htb.HTBObject):
         "discord",
         "public",
         "can_delete_avatar",
-        "captain",
+        "_captain_id",
         "is_respected",
         "join_request_sent",
     )
@@ -56,18 +77,21 @@ class Team(htb.HTBObject):
     public: bool
     can_delete_avatar: bool
     # noinspection PyUnresolvedReferences
-    _captain: Optional["User"] = None
-    is_respected: Optional[bool] = None
-    join_request_sent: Optional[bool] = None
-    _ranking: Optional[int] = None
+    _captain: Optional["User"]
+    is_respected: Optional[bool]
+    join_request_sent: Optional[bool]
+    _ranking: Optional[int]
     _captain_id: int
 
     def __repr__(self):
         return f"<Team '{self.name}'>"
 
     def __init__(self, data: dict, client: htb.HTBClient, summary: bool = False):
-        self._client = client
-        self._detailed_func = client.get_team  # type: ignore
+        super().__init__(client, summary)
+        self._captain = None
+        self._ranking = None
+        self.is_respected = None
+        self.join_request_sent = None
         self.id = data["id"]
         self.name = data["name"]
         if not summary:
@@ -85,8 +109,6 @@ class Team(htb.HTBObject):
             self._captain_id = data["captain"]["id"]
             self.is_respected = data["is_respected"]
             self.join_request_sent = data["join_request_sent"]
-        else:
-            self._is_summary = True
 
     @property
     def ranking(self) -> int:
@@ -49,6 +49,41 @@ class User(htb.HTBObject):
 
     """
 
+    __slots__ = (
+        "name",
+        "avatar",
+        "ranking",
+        "points",
+        "root_owns",
+        "user_owns",
+        "root_bloods",
+        "user_bloods",
+        "rank_name",
+        "timezone",
+        "vip",
+        "vip_plus",
+        "respects",
+        "university",
+        "university_name",
+        "description",
+        "github",
+        "linkedin",
+        "twitter",
+        "website",
+        "respected",
+        "followed",
+        "rank_id",
+        "rank_progress",
+        "next_rank",
+        "next_rank_points",
+        "rank_ownership",
+        "rank_requirement",
+        "country_name",
+        "team",
+        "public",
+        "_activity",
+    )
+
     name: str
     avatar: str
     ranking: int
@@ -59,6 +94,7 @@ class User(htb.HTBObject):
     user_bloods: int
     rank_name: str
 
+    _detailed_method = "get_user"
     _detailed_attributes = (
         "timezone",
         "vip",
@@ -88,7 +124,7 @@ class User(htb.HTBObject):
     vip_plus: bool
     respects: int
     # TODO: University object
-    university = None
+    university: Optional[dict]
     university_name: str
     description: str
     github: str
@@ -108,7 +144,7 @@ class User(htb.HTBObject):
     team: "Team"
     public: bool
 
-    _activity: Optional[List[Solve]] = None
+    _activity: Optional[List[Solve]]
 
     @property
     def activity(self):
@@ -136,15 +172,15 @@ class User(htb.HTBObject):
     # noinspection PyUnresolvedReferences
     def __init__(self, data: dict, client: "HTBClient", summary: bool = False):
         """Initialise a `User` using API data"""
-        self._client = client
-        self._detailed_func = client.get_user  # type: ignore
+        super().__init__(client, summary)
+        self._activity = None
+        self.university = None
         self.id = data["id"]
         self.name = data["name"]
         self.user_owns = data["user_owns"]
         self.points = data["points"]
 
         if summary:
-            self._is_summary = True
             self.ranking = data["rank"]
             self.root_owns = data["root_owns"]
             self.user_bloods = data.get("user_bloods_count") or 0
@@ -1,5 +1,8 @@
+from __future__ import annotations
+
 import re
-from datetime import timedelta
+from datetime import datetime, timedelta
+from typing import Hashable
 
 
 def parse_delta(time: str) -> timedelta:
@@ -31,7 +34,7 @@ def parse_delta(time: str) -> timedelta:
         "minutes": 0,
         "seconds": 0,
     }
-    for (name, param) in parts_dict.items():
+    for name, param in parts_dict.items():
         if param:
             time_params[name] = int(param)
     # Remove unsupported params for timedelta
@@ -40,3 +43,44 @@ def parse_delta(time: str) -> timedelta:
     time_params["days"] += time_params["months"] * 30
     del time_params["months"]
     return timedelta(**time_params)
+
+
+def parse_datetime(date: str) -> datetime:
+    """Parses a date from the API
+
+    The API sends ISO 8601 timestamps such as ``2022-11-12T10:00:00.000000Z``, which
+    `datetime.fromisoformat` handles directly. Anything else falls back to `dateutil`,
+    which is only imported if it's needed.
+
+    Args:
+        date: The date as a string
+
+    Returns:
+        A datetime.datetime object
+
+    """
+    try:
+        if date.endswith("Z"):
+            date = date[:-1] + "+00:00"
+        return datetime.fromisoformat(date)
+    except ValueError:
+        import dateutil.parser
+
+        return dateutil.parser.parse(date)
+
+
+def normalise_ident(ident: int | str) -> Hashable:
+    """Turns an ID or name into a lookup key
+
+    IDs given as strings of digits match the integer ID, and names ignore case.
+
+    Args:
+        ident: The ID or name
+
+    Returns:
+        The key to look the object up by
+
+    """
+    if isinstance(ident, str):
+        return int(ident) if ident.isdigit() else ident.lower()
+    return ident
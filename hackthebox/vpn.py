@@ -44,11 +44,10 @@ class VPNServer(htb.HTBObject):
     friendly_name: str
     current_clients: int
     location: str
-    _detailed_func = lambda x: None
 
     # noinspection PyUnresolvedReferences
     def __init__(self, data: dict, client: "HTBClient", summary=False):
-        self._client = client
+        super().__init__(client)
         self.id = data["id"]
         self.friendly_name = data["friendly_name"]
         self.current_clients = data["current_clients"]
@@ -73,6 +72,7 @@ class VPNServer(htb.HTBObject):
             self._client.do_request(f"connections/servers/switch/{self.id}", post=True),
         )
         if result["status"] is True:
+            self._client._invalidate_connections()
             return True
         if (
             result["message"]
@@ -97,11 +97,11 @@ class VPNServer(htb.HTBObject):
         if tcp:
             # Funky URL
             url += "/1"
-        data = self._client.do_request(url, download=True)
+        data = cast(bytes, self._client.do_request(url, download=True))
         # We can't download VPN packs for servers we're not assigned to
         if b"You are not assigned" in data:
             self.switch()
-        data = cast(bytes, self._client.do_request(url, download=True))
+            data = cast(bytes, self._client.do_request(url, download=True))
         with open(path, "wb") as f:
             f.write(data)
         return path
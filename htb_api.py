@@ -1,90 +1,185 @@
 import os
 import sys
+import json
+import time
+import atexit
 import argparse
 import Constants
 
-from hackthebox import HTBClient
-from templates_md import get_machine_template, get_machine_template, get_index_template, get_recon_template, get_exploitation_template, get_post_exploitation_template
+from hackthebox.constants import API_BASE, POOL_SIZE
+from hackthebox.errors import NotFoundException
+from htnotes.worker import IDLE_TIMEOUT, serve, socket_path
+
+# The client, templates and their dependencies are imported once the arguments are known to be good
 
 # Params
 parser = argparse.ArgumentParser(description='A test program.')
 parser.add_argument("-m", "--machine_name", help="Input of the machine", default="",required=False)
-parser.add_argument("-v", "--vault_path", help="Path of obsidian vault", default="",required=True)
-args = parser.parse_args()
+parser.add_argument("-v", "--vault_path", help="Path of obsidian vault", default="")
+parser.add_argument("--api-base", help="Base URL of the HTB API, e.g. a local mock", default=os.environ.get("HTB_API_BASE", API_BASE))
+parser.add_argument("-j", "--jobs", help="Machines refreshed at once by the bulk update", type=int, default=4)
+parser.add_argument("--full", help="Refresh every note in the bulk update, not only those the machine lists show changed", action="store_true")
+parser.add_argument("--time-budget", help="Stop starting machines in the bulk update once it would take longer than this many seconds; the most stale go first", type=float, default=None)
+parser.add_argument("--request-budget", help="Stop starting machines in the bulk update once it would send more than this many API requests", type=int, default=None)
+parser.add_argument("--resume", help="Skip the machines an interrupted bulk update already refreshed", action="store_true")
+parser.add_argument("--no-cache", help="Do not read or write the API response cache", action="store_true")
+parser.add_argument("--refresh", help="Fetch everything again, ignoring fresh cache entries", action="store_true")
+parser.add_argument("--metrics", help="Write request metrics to this file at exit ('-' prints them)", default=None)
+parser.add_argument("--metrics-format", help="Format of --metrics", choices=["json", "prometheus"], default="json")
+parser.add_argument("--record", help="Record every API exchange to this cassette file", default=None)
+parser.add_argument("--replay", help="Answer API requests from this cassette file instead of the network", default=None)
+parser.add_argument("--replay-latency", help="Seconds to wait before each replayed response", type=float, default=0.0)
+parser.add_argument("--serve", help="Keep running as a worker answering htb_send.py on a Unix socket (default: " + socket_path() + ")", nargs="?", const=socket_path(), default=None, metavar="SOCKET")
+parser.add_argument("--idle-timeout", help="Seconds without a request before the worker exits", type=float, default=IDLE_TIMEOUT)
+CACHE_PATH = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "htnotes", "responses.sqlite")
+# Long enough for the lookups of one command to share objects, short enough that the next
+# button press (or the worker's next request) sees flags submitted in between
+IDENTITY_TTL = 10
+
+
+def build_client(args):
+    from hackthebox import HTBClient
+    from hackthebox.cache import ResponseCache
+    from hackthebox.identity import IdentityMap
+
+    response_cache = None
+    if not (args.no_cache or args.record or args.replay):
+        # Cassettes need every exchange to go through the client
+        response_cache = ResponseCache(CACHE_PATH)
+        response_cache.refresh = args.refresh
+
+    cassette = None
+    if args.replay or args.record:
+        from hackthebox.cassette import Cassette
+    if args.replay:
+        cassette = Cassette(args.replay, "replay", latency=args.replay_latency)
+    elif args.record:
+        cassette = Cassette(args.record, "record")
+        atexit.register(cassette.save)
+
+    return HTBClient(app_token=Constants.API_TOKEN, api_base=args.api_base, pool_size=max(POOL_SIZE, args.jobs), response_cache=response_cache, identity_map=IdentityMap(ttl=IDENTITY_TTL), cassette=cassette)
+
+
+def dump_metrics(client, args):
+    from hackthebox.metrics import to_prometheus
+
+    if args.metrics_format == "prometheus":
+        output = to_prometheus(client.metrics())
+    else:
+        output = json.dumps(client.metrics(), indent=2)
+    if args.metrics == "-":
+        print(output)
+    else:
+        with open(args.metrics, "w") as metrics_file:
+            metrics_file.write(output)
+
+
+class Progress:
+    def __init__(self, total):
+        self.total = total
+        self.done = 0
+        self.start = time.perf_counter()
 
+    def __call__(self, result):
+        self.done += 1
+        prefix = f"[{self.done}/{self.total}] "
+        if result.ok and not result.written:
+            print(prefix + "Unchanged " + result.name)
+        elif result.ok:
+            print(prefix + "Finished execution of update " + result.name)
+        else:
+            print(prefix + f"Failed to update {result.name}: {type(result.error).__name__} {result.error}")
 
-machine_name = args.machine_name 
-VAULT_PATH = args.vault_path
+    def summary(self, failed):
+        elapsed = time.perf_counter() - self.start
+        rate = self.done / elapsed if elapsed else 0
+        print(f"Updated {self.done - failed}/{self.total} machines in {elapsed:.1f}s ({rate:.1f}/s)")
+
+
+def run(args, client):
+    from htnotes import Budget, Journal, Manifest, bulk_update, diff_catalog, fetch_catalog, machine_folders, prioritize, update_machine
+
+    machine_name = args.machine_name
+    VAULT_PATH = args.vault_path
 
-client = HTBClient(app_token=Constants.API_TOKEN)
-try:
     if machine_name == "":  #Recursively update of all machines
-        folder = VAULT_PATH + "Machines"
-        sub_folders = [name for name in os.listdir(folder) if os.path.isdir(os.path.join(folder, name))]
-        for sub_folder in sub_folders:
-            os.system("/usr/bin/python3 " +  VAULT_PATH + "../htb_api.py -m " + sub_folder + ' -v "' + VAULT_PATH + '"')
-            print("Finished execution of update " + sub_folder )    
-        exit()
-    else:
-        machine_data = client.get_machine(machine_name)
-except:
-    if machine_name != "": #Checks only if machine_name does not exist 
+        names = machine_folders(VAULT_PATH)
+        journal = Journal(VAULT_PATH)
+        budget = None
+        if args.time_budget is not None or args.request_budget is not None:
+            budget = Budget(args.time_budget, args.request_budget)
+            budget.start(client)  # The machine lists count towards it too
+        if args.resume and journal.interrupted:
+            done = journal.completed()
+            print(f"Resuming: {len(done)} machines already refreshed")
+            names = [name for name in names if name not in done]
+        catalog = fetch_catalog(client)
+        if not args.full:
+            diff = diff_catalog(client, VAULT_PATH, names, catalog)
+            print(f"{len(diff.changed)} changed, {len(diff.unchanged)} up to date, {len(diff.unlisted)} not in the machine lists")
+            names = diff.stale
+        names = prioritize(names, catalog, journal.last_fetched())
+        progress = Progress(len(names))
+        manifest = Manifest(VAULT_PATH)
+
+        def checkpoint(result):
+            # The note is on disk; make the manifest and journal say so before moving on
+            manifest.save()
+            journal.record(result)
+            progress(result)
+
+        journal.start(names, resume=args.resume)
+        try:
+            results = bulk_update(client, VAULT_PATH, names, on_result=checkpoint, jobs=args.jobs, manifest=manifest, budget=budget)
+        except KeyboardInterrupt:
+            print(f"Interrupted after {progress.done}/{progress.total} machines; run again with --resume to continue")
+            return 130
+        failed = [result.name for result in results if not result.ok]
+        progress.summary(len(failed))
+        if len(results) < len(names):
+            print(f"Budget spent after {budget.elapsed:.1f}s and {budget.requests_used} requests; {len(names) - len(results)} machines left for the next run")
+        if failed:
+            print("Failed: " + ", ".join(failed))
+            print("Run again with --resume to retry only those")
+            return 1
+        journal.finish()
+        return 0
+
+    try:
+        result = update_machine(client, VAULT_PATH, machine_name)
+    except NotFoundException:
         print(f"{machine_name} not found.")
-    exit()
-
-try:    
-    machine_tags = client.get_tags_machine(int(machine_data.id))
-except:
-    machine_tags = []
-
-try:    
-    matrix = client.get_matrix(int(machine_data.id))
-except:
-    matrix = []
-
-try:    
-    user_rating = client.get_user_rating(int(machine_data.id))
-except:
-    user_rating = []
-
-
-author = matrix["maker"]
-user_average = matrix["aggregate"]
-MACHINE_FOLDER_PATH = VAULT_PATH + "Machines/" + machine_data.name 
-
-#Call templates
-machine_template = get_machine_template(VAULT_PATH,machine_data,user_average,author, user_rating, machine_tags)
-
-#In case of first execution, create Machine Folder
-if not os.path.exists(VAULT_PATH + "Machines/"):
-    os.makedirs(VAULT_PATH + "Machines/")
-
-
-# You can change me to define your folder structure
-if not os.path.exists(MACHINE_FOLDER_PATH):
-    os.makedirs(MACHINE_FOLDER_PATH)
-    print("Created machine root folder")
-    if not os.path.exists(MACHINE_FOLDER_PATH + "/assets"):
-        os.makedirs(MACHINE_FOLDER_PATH + "/assets")
-        print(("Created assets folder"))
-    with open(os.path.join(MACHINE_FOLDER_PATH, "00-index.md"), 'w') as temp_file:
-      temp_file.writelines(get_index_template())
-      print("Created 00-index.md")
-    with open(os.path.join(MACHINE_FOLDER_PATH, "01-recon.md"), 'w') as temp_file:
-        temp_file.writelines(get_recon_template())
-        print("Created 01-recon.md")
-    with open(os.path.join(MACHINE_FOLDER_PATH, "02-exploitation.md"), 'w') as temp_file:
-        temp_file.writelines(get_exploitation_template())
-        print("Created 02-exploitation.md")
-    with open(os.path.join(MACHINE_FOLDER_PATH, "03-post-exploitation.md"), 'w') as temp_file:
-        temp_file.writelines(get_post_exploitation_template())
-        print("Created 03-post-exploitation.md")
-
-
-# Create the file info machine
-with open(os.path.join(MACHINE_FOLDER_PATH, machine_data.name + ".md"), 'w') as temp_file:
-    temp_file.writelines(machine_template)
-    print("Created/Updated machine file ")
-
-
-print("Exiting...")
\ No newline at end of file
+        return 1
+    if result.created:
+        print("Created machine folder and templates")
+    print("Created/Updated machine file " if result.written else "Machine file unchanged")
+    print("Exiting...")
+    return 0
+
+
+def main(argv=None):
+    args = parser.parse_args(argv)
+    if not args.serve and not args.vault_path:
+        parser.error("the following arguments are required: -v/--vault_path")
+
+    client = build_client(args)
+    if args.metrics:
+        atexit.register(dump_metrics, client, args)
+
+    if args.serve:
+        # Commands sent to the worker use its client, so their client options are ignored
+        def handle(request_argv, cwd):
+            request_args = parser.parse_args(request_argv)
+            if not request_args.vault_path:
+                parser.error("the following arguments are required: -v/--vault_path")
+            request_args.vault_path = os.path.join(cwd, request_args.vault_path)
+            return run(request_args, client)
+
+        print(f"Listening on {args.serve}")
+        serve(handle, args.serve, args.idle_timeout)
+        return 0
+    return run(args, client)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+"""
+Run an htb_api.py command line on the worker started with `htb_api.py --serve`.
+
+Only the standard library is imported, so forwarding a command costs little more than
+starting the interpreter. When no worker is listening, htb_api.py is run instead with the
+same arguments.
+"""
+
+import json
+import os
+import socket
+import sys
+
+HTB_API = os.path.join(os.path.dirname(os.path.realpath(__file__)), "htb_api.py")
+
+
+def socket_path():
+    # Keep in step with htnotes.worker.socket_path
+    if os.environ.get("HTNOTES_SOCKET"):
+        return os.environ["HTNOTES_SOCKET"]
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or os.path.join(
+        os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "htnotes"
+    )
+    return os.path.join(runtime_dir, "htnotes.sock")
+
+
+def main():
+    argv = sys.argv[1:]
+    worker = socket.socket(socket.AF_UNIX)
+    try:
+        worker.connect(socket_path())
+    except OSError:
+        worker.close()
+        os.execv(sys.executable, [sys.executable, HTB_API, *argv])
+
+    with worker:
+        request = {"argv": argv, "cwd": os.getcwd()}
+        worker.sendall((json.dumps(request) + "\n").encode())
+        for line in worker.makefile("r"):
+            message = json.loads(line)
+            if "exit" in message:
+                return message["exit"]
+            sys.stdout.write(message["out"])
+            sys.stdout.flush()
+    print("The worker closed the connection before finishing", file=sys.stderr)
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
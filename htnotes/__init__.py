@@ -0,0 +1,48 @@
+"""
+The vault side of HTNotes: turning `hackthebox` data into Obsidian machine notes.
+
+`htb_api.py` is a thin command line over this package, so other front ends can share the
+same client and caches across many notes.
+"""
+
+from typing import TYPE_CHECKING
+
+# Loaded on first use, so `htnotes.worker` can be imported without the templates (PEP 562)
+_EXPORTS = {
+    "UpdateResult": "vault",
+    "bulk_update": "vault",
+    "machine_folders": "vault",
+    "update_machine": "vault",
+    "Manifest": "manifest",
+    "CatalogDiff": "catalog",
+    "diff_catalog": "catalog",
+    "fetch_catalog": "catalog",
+    "Journal": "journal",
+    "Budget": "scheduler",
+    "prioritize": "scheduler",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
+
+
+if TYPE_CHECKING:
+    from .vault import UpdateResult, bulk_update, machine_folders, update_machine
+    from .manifest import Manifest
+    from .catalog import CatalogDiff, diff_catalog, fetch_catalog
+    from .journal import Journal
+    from .scheduler import Budget, prioritize
@@ -0,0 +1,152 @@
+"""
+Work out which machine notes are out of date from the two machine list endpoints.
+
+The active and retired machine lists carry the owned flags, stars and difficulty of every
+machine, which is everything a note records that changes over time. Comparing them with the
+Dataview fields of each note (``user_flag:: True`` and so on) finds the notes worth refreshing
+in two requests, instead of fetching every machine's profile.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from .vault import MACHINES_FOLDER, machine_folders
+
+if TYPE_CHECKING:
+    from hackthebox import HTBClient, Machine
+
+_NOTE_FIELD = re.compile(r"^(\w+)::[ \t]*(.*?)[ \t]*$", re.MULTILINE)
+
+
+def read_note_fields(path: str) -> Dict[str, str]:
+    """The Dataview fields of a note
+
+    Args:
+        path: The note
+
+    Returns:
+        The ``key:: value`` fields of the note, or an empty dict if it doesn't exist
+
+    """
+    try:
+        with open(path) as f:
+            return dict(_NOTE_FIELD.findall(f.read()))
+    except FileNotFoundError:
+        return {}
+
+
+def summary_fields(machine: Machine, active: bool) -> Dict[str, str]:
+    """The note fields a machine list entry determines, as the template renders them
+
+    Args:
+        machine: A summary `Machine` from `HTBClient.get_machines`
+        active: Whether it came from the active list
+
+    """
+    return {
+        "id": str(machine.id),
+        "name": machine.name,
+        "active": str(active),
+        "user_flag": str(bool(machine.user_owned)),
+        "root_flag": str(bool(machine.root_owned)),
+        "difficulty_text": machine.difficulty,
+        "stars": str(machine.stars),
+    }
+
+
+class CatalogDiff:
+    """The machines of a vault, split by whether the catalog says their note changed
+
+    Attributes:
+        changed: Machines whose note disagrees with the catalog, or has no note yet
+        unchanged: Machines whose note matches the catalog
+        unlisted: Folders that don't match any machine in the catalog
+
+    """
+
+    changed: List[str]
+    unchanged: List[str]
+    unlisted: List[str]
+
+    def __init__(self):
+        self.changed = []
+        self.unchanged = []
+        self.unlisted = []
+
+    @property
+    def stale(self) -> List[str]:
+        """The machines to refresh: changed ones and ones the catalog can't vouch for"""
+        return self.changed + self.unlisted
+
+    def __repr__(self):
+        return (
+            f"<CatalogDiff {len(self.changed)} changed, {len(self.unchanged)} unchanged, "
+            f"{len(self.unlisted)} unlisted>"
+        )
+
+
+def fetch_catalog(client: HTBClient) -> Dict[str, Machine]:
+    """Fetch the active and retired machine lists
+
+    Both lists are revalidated even if the response cache holds them, since a diff against
+    an old copy would miss whatever changed since.
+
+    Args:
+        client: The API client
+
+    Returns:
+        Every listed machine, keyed by its lowercased name. Their `retired` attribute tells
+        which list they came from.
+
+    """
+    catalog = {}
+    for retired in (False, True):
+        for machine in client.get_machines(retired=retired, refresh=True):
+            catalog[machine.name.lower()] = machine
+    return catalog
+
+
+def diff_catalog(
+    client: HTBClient,
+    vault_path: str,
+    names: Optional[List[str]] = None,
+    catalog: Optional[Dict[str, Machine]] = None,
+) -> CatalogDiff:
+    """Compare a vault's notes with the machine lists
+
+    Whatever the client has cached about the changed machines is invalidated, so refreshing
+    their notes fetches the new details rather than the ones the notes were written from.
+
+    Args:
+        client: The API client
+        vault_path: The vault root
+        names: The machine folders to check; by default every folder under ``Machines/``
+        catalog: The machine lists from `fetch_catalog`, if already fetched
+
+    Returns:
+        Which machines changed, in the order of `names`
+
+    """
+    if names is None:
+        names = machine_folders(vault_path)
+    if catalog is None:
+        catalog = fetch_catalog(client)
+
+    diff = CatalogDiff()
+    for name in names:
+        machine = catalog.get(name.lower())
+        if machine is None:
+            diff.unlisted.append(name)
+            continue
+        expected = summary_fields(machine, not machine.retired)
+        path = os.path.join(vault_path, MACHINES_FOLDER, name, expected["name"] + ".md")
+        fields = read_note_fields(path)
+        if any(fields.get(key) != value for key, value in expected.items()):
+            diff.changed.append(name)
+            client.invalidate_machine(machine.id, name)
+        else:
+            diff.unchanged.append(name)
+    return diff
@@ -0,0 +1,132 @@
+"""
+A checkpoint journal of bulk refreshes, so an interrupted run can pick up where it stopped.
+
+The journal is a JSON lines file in the vault. Each run starts with a ``{"run": ...}`` line,
+then gets one line per machine as soon as its note is on disk, and ends with a
+``{"finished": ...}`` line. Every line is flushed and fsynced before the next machine is
+reported, so a run killed at any point loses at most the machines still in flight.
+
+Machine lines also record when the machine was last fetched, which outlives the run:
+starting a new run compacts the journal down to the latest line per machine.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional, Set
+
+from .manifest import atomic_write
+
+if TYPE_CHECKING:
+    from .vault import UpdateResult
+
+JOURNAL_NAME = ".htnotes-journal.jsonl"
+
+
+class Journal:
+    """The checkpoint journal of a vault
+
+    Args:
+        vault_path: The vault root; the journal is kept in it as `JOURNAL_NAME`
+
+    """
+
+    path: str
+    _lines: List[dict]
+    _lock: threading.Lock
+
+    def __init__(self, vault_path: str):
+        self.path = os.path.join(vault_path, JOURNAL_NAME)
+        self._lock = threading.Lock()
+        self._lines = []
+        torn = False
+        try:
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        self._lines.append(json.loads(line))
+                    except ValueError:
+                        torn = True
+        except FileNotFoundError:
+            pass
+        if torn:
+            # A write cut short by a crash; drop it before anything is appended to it
+            self._rewrite()
+
+    def _current_run(self) -> Optional[List[dict]]:
+        """The lines of the last run, or None if it finished or there never was one"""
+        for i in range(len(self._lines) - 1, -1, -1):
+            line = self._lines[i]
+            if "finished" in line:
+                return None
+            if "run" in line:
+                return self._lines[i + 1 :]
+        return None
+
+    @property
+    def interrupted(self) -> bool:
+        """Whether the last run stopped before finishing"""
+        return self._current_run() is not None
+
+    def completed(self) -> Set[str]:
+        """The machines the last run refreshed successfully, if it didn't finish"""
+        return {
+            line["name"] for line in self._current_run() or () if line.get("ok", False)
+        }
+
+    def last_fetched(self) -> Dict[str, float]:
+        """When each machine was last refreshed successfully, as a Unix timestamp"""
+        fetched = {}
+        for line in self._lines:
+            if line.get("ok"):
+                fetched[line["name"]] = line["fetched_at"]
+        return fetched
+
+    def _rewrite(self):
+        atomic_write(
+            self.path,
+            "".join(
+                json.dumps(line, separators=(",", ":")) + "\n" for line in self._lines
+            ),
+        )
+
+    def _append(self, line: dict):
+        with self._lock:
+            self._lines.append(line)
+            with open(self.path, "a") as f:
+                f.write(json.dumps(line, separators=(",", ":")) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def start(self, names: List[str], resume: bool = False):
+        """Begin a run
+
+        Args:
+            names: The machines the run will refresh
+            resume: Carry on the interrupted run instead of starting a new one
+
+        """
+        if resume and self.interrupted:
+            return
+        with self._lock:
+            latest = {}
+            for line in self._lines:
+                if line.get("ok"):
+                    latest[line["name"]] = line
+            self._lines = list(latest.values())
+            self._rewrite()
+        self._append({"run": time.time(), "machines": len(names)})
+
+    def record(self, result: UpdateResult):
+        """Checkpoint one machine"""
+        line = {"name": result.name, "ok": result.ok, "fetched_at": time.time()}
+        if not result.ok:
+            line["error"] = f"{type(result.error).__name__}: {result.error}"
+        self._append(line)
+
+    def finish(self):
+        """Mark the run as complete, so the next one starts afresh"""
+        self._append({"finished": time.time()})
@@ -0,0 +1,139 @@
+"""
+Write generated notes only when their content changes, and never leave one half-written.
+
+Every rewrite of a note makes Obsidian and Dataview reindex it, so notes are compared with
+what was written last time before touching the disk. Lines that change on every run without
+meaning anything, such as the date the note was generated, are left out of the comparison
+and keep their original value when the note does change.
+
+The manifest maps each generated file, relative to the vault, to the hash of its content
+without those lines and the file's modification time and size when it was written, so an
+unchanged note that nobody edited costs neither a read nor a write.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import stat
+import tempfile
+import threading
+from typing import Dict, List
+
+MANIFEST_NAME = ".htnotes-manifest.json"
+
+# Lines of the machine template that are regenerated on every run
+VOLATILE_LINES = re.compile(r"^(?:created::.*|\| Created Note .*)$", re.MULTILINE)
+
+
+def content_hash(content: str) -> str:
+    """Hash a note, ignoring its volatile lines"""
+    return hashlib.sha256(VOLATILE_LINES.sub("", content).encode()).hexdigest()
+
+
+def atomic_write(path: str, content: str):
+    """Replace a file by renaming a complete temporary copy over it"""
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path) or ".", prefix=".", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates files only the owner can read
+        try:
+            os.chmod(tmp_path, stat.S_IMODE(os.stat(path).st_mode))
+        except FileNotFoundError:
+            os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _keep_volatile_lines(content: str, old_content: str) -> str:
+    """Carry the volatile lines of the previous version over into the new one"""
+    old_lines: List[str] = VOLATILE_LINES.findall(old_content)
+    if not old_lines:
+        return content
+    lines = iter(old_lines)
+    return VOLATILE_LINES.sub(lambda match: next(lines, match.group(0)), content)
+
+
+class Manifest:
+    """The content hashes and stats of the files written to a vault
+
+    Args:
+        vault_path: The vault root; the manifest is kept in it as `MANIFEST_NAME`
+
+    """
+
+    _vault_path: str
+    _path: str
+    _entries: Dict[str, list]
+    _dirty: bool
+    _lock: threading.Lock
+
+    def __init__(self, vault_path: str):
+        self._vault_path = vault_path
+        self._path = os.path.join(vault_path, MANIFEST_NAME)
+        self._dirty = False
+        self._lock = threading.Lock()
+        try:
+            with open(self._path) as f:
+                self._entries = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self._entries = {}
+
+    def _key(self, path: str) -> str:
+        return os.path.relpath(path, self._vault_path)
+
+    def write(self, path: str, content: str) -> bool:
+        """Write a file unless its content, volatile lines aside, is unchanged
+
+        Args:
+            path: The file
+            content: Its new content
+
+        Returns:
+            Whether the file was written
+
+        """
+        key = self._key(path)
+        new_hash = content_hash(content)
+        with self._lock:
+            known = self._entries.get(key)
+        try:
+            file_stat = os.stat(path)
+        except FileNotFoundError:
+            file_stat = None
+        if file_stat is not None:
+            if known == [new_hash, file_stat.st_mtime_ns, file_stat.st_size]:
+                return False
+            # Edited since, or written before the manifest existed: compare the file itself
+            with open(path) as f:
+                old_content = f.read()
+            if content_hash(old_content) == new_hash:
+                self._remember(key, new_hash, file_stat)
+                return False
+            content = _keep_volatile_lines(content, old_content)
+        atomic_write(path, content)
+        self._remember(key, new_hash, os.stat(path))
+        return True
+
+    def _remember(self, key: str, digest: str, file_stat: os.stat_result):
+        with self._lock:
+            self._entries[key] = [digest, file_stat.st_mtime_ns, file_stat.st_size]
+            self._dirty = True
+
+    def save(self):
+        """Write the manifest out if anything changed"""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = json.dumps(self._entries, indent=1, sort_keys=True)
+            self._dirty = False
+        atomic_write(self._path, data)
@@ -0,0 +1,160 @@
+"""
+Decide which machine notes a bulk refresh spends its requests on first.
+
+Not every note goes stale at the same rate. An active machine we haven't finished changes
+with every flag we submit and every rating it gets; a retired box rooted months ago almost
+never does. `prioritize` puts the machines most likely to have changed first:
+
+1. active machines,
+2. then machines owned on one side only (user without root, or the other way round),
+3. then everything else,
+
+and within each group, the ones fetched longest ago first, going by the `Journal`.
+
+A `Budget` then caps how many of them a run starts, by wall time, by API requests or both,
+so a quick refresh covers the top of the list and leaves the rest for the next run.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from hackthebox import HTBClient, Machine
+
+# What refreshing a machine costs before a run has measured it: profile, tags, matrix and
+# rating, see `HTBClient.get_machine_bundle`
+REQUESTS_PER_MACHINE = 4
+
+ACTIVE = 0
+PARTIALLY_OWNED = 1
+OTHER = 2
+
+
+def priority_group(machine: Optional[Machine]) -> int:
+    """Which group of `prioritize` a machine falls in
+
+    Args:
+        machine: The machine's entry in `fetch_catalog`, or None if it isn't listed
+
+    """
+    if machine is None:
+        return OTHER
+    if not machine.retired:
+        return ACTIVE
+    if bool(machine.user_owned) != bool(machine.root_owned):
+        return PARTIALLY_OWNED
+    return OTHER
+
+
+def prioritize(
+    names: List[str],
+    catalog: Dict[str, Machine],
+    last_fetched: Dict[str, float],
+) -> List[str]:
+    """Order machines by how much refreshing them is worth
+
+    Args:
+        names: The machine folders to order
+        catalog: The machine lists, from `fetch_catalog`
+        last_fetched: When each machine was last refreshed, from `Journal.last_fetched`.
+                      Machines missing from it count as never fetched.
+
+    Returns:
+        `names`, most worthwhile first. Ties keep their order in `names`.
+
+    """
+
+    def key(name: str) -> Tuple[int, float]:
+        return (
+            priority_group(catalog.get(name.lower())),
+            last_fetched.get(name, -math.inf),
+        )
+
+    return sorted(names, key=key)
+
+
+class Budget:
+    """A limit on the time and API requests a bulk refresh may spend
+
+    The budget is checked before each machine is started, using what the machines finished
+    so far cost on average, so a run stops short of the limit rather than overshooting it
+    by a machine or more. Requests answered from the response cache are free.
+
+    Args:
+        seconds: The wall time the run may take, if limited
+        requests: The API requests the run may send, if limited
+
+    """
+
+    seconds: Optional[float]
+    requests: Optional[int]
+    _client: Optional[HTBClient]
+    _start: float
+    _start_requests: int
+    # When the first machine was started, to cost machines apart from the machine lists
+    _first: Optional[Tuple[float, int]]
+
+    def __init__(self, seconds: Optional[float] = None, requests: Optional[int] = None):
+        self.seconds = seconds
+        self.requests = requests
+        self._client = None
+        self._start = time.monotonic()
+        self._start_requests = 0
+        self._first = None
+
+    def start(self, client: HTBClient):
+        """Start spending the budget, counting the requests `client` sends from now on"""
+        self._client = client
+        self._start = time.monotonic()
+        self._start_requests = self._requests_sent()
+        self._first = None
+
+    def _requests_sent(self) -> int:
+        if self._client is None:
+            return 0
+        endpoints = self._client.metrics()["endpoints"]
+        return sum(stats["requests"] for stats in endpoints.values())
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since `start`"""
+        return time.monotonic() - self._start
+
+    @property
+    def requests_used(self) -> int:
+        """Requests sent since `start`"""
+        return self._requests_sent() - self._start_requests
+
+    def allows(self, in_flight: int, finished: int) -> bool:
+        """Whether there is room to start one more machine
+
+        Args:
+            in_flight: Machines started but not finished
+            finished: Machines finished since `start`
+
+        """
+        elapsed = self.elapsed
+        used = self.requests_used
+        if self._first is None:
+            self._first = (elapsed, used)
+        first_elapsed, first_used = self._first
+        if self.seconds is not None:
+            # The run finishes a machine every so often however many are in flight;
+            # before the first one there is nothing to go on
+            per_machine = (elapsed - first_elapsed) / finished if finished else 0.0
+            if elapsed + per_machine * (in_flight + 1) > self.seconds:
+                return False
+        if self.requests is not None:
+            if finished:
+                per_machine = (used - first_used) / finished
+            else:
+                per_machine = REQUESTS_PER_MACHINE
+            if used + per_machine * (in_flight + 1) > self.requests:
+                return False
+        return True
+
+    def __repr__(self):
+        return f"<Budget {self.seconds}s, {self.requests} requests>"
@@ -0,0 +1,264 @@
+"""
+Create and refresh the machine notes of an Obsidian vault.
+
+A vault keeps one folder per machine under ``Machines/``, holding the generated
+``<Machine>.md`` info note next to the writeup templates. Creating a note makes the folder
+and templates; refreshing only rewrites the info note, and only if it changed.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, List, Optional
+
+from templates_md import (
+    get_exploitation_template,
+    get_index_template,
+    get_machine_template,
+    get_post_exploitation_template,
+    get_recon_template,
+)
+
+from .manifest import Manifest
+
+if TYPE_CHECKING:
+    from hackthebox import HTBClient
+
+    from .scheduler import Budget
+
+MACHINES_FOLDER = "Machines"
+
+# The writeup templates created alongside a new machine note
+TEMPLATES = (
+    ("00-index.md", get_index_template),
+    ("01-recon.md", get_recon_template),
+    ("02-exploitation.md", get_exploitation_template),
+    ("03-post-exploitation.md", get_post_exploitation_template),
+)
+
+
+class UpdateResult:
+    """The outcome of writing one machine note
+
+    Attributes:
+        name: The machine name the update was asked for
+        path: The note written, if any
+        created: Whether the machine folder was created by this update
+        written: Whether the note's content changed and was written
+        error: The exception that stopped the update, if it failed
+        seconds: How long the update took
+
+    """
+
+    name: str
+    path: Optional[str]
+    created: bool
+    written: bool
+    error: Optional[BaseException]
+    seconds: float
+
+    def __init__(
+        self,
+        name: str,
+        path: Optional[str] = None,
+        created: bool = False,
+        written: bool = False,
+        error: Optional[BaseException] = None,
+        seconds: float = 0.0,
+    ):
+        self.name = name
+        self.path = path
+        self.created = created
+        self.written = written
+        self.error = error
+        self.seconds = seconds
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self):
+        status = "ok" if self.ok else f"failed: {self.error!r}"
+        return f"<UpdateResult '{self.name}' {status}>"
+
+
+def machine_folders(vault_path: str) -> List[str]:
+    """The machine folders of a vault
+
+    Args:
+        vault_path: The vault root
+
+    Returns:
+        The folder names under ``Machines/``, sorted; empty if there is no such folder
+
+    """
+    folder = os.path.join(vault_path, MACHINES_FOLDER)
+    if not os.path.isdir(folder):
+        return []
+    return sorted(
+        name for name in os.listdir(folder) if os.path.isdir(os.path.join(folder, name))
+    )
+
+
+def render_machine_note(client: HTBClient, vault_path: str, machine_name: str):
+    """Fetch a machine with its tags and graphs and render its info note
+
+    Args:
+        client: The API client
+        vault_path: The vault root, which the note links its images against
+        machine_name: The name or ID of the machine
+
+    Returns:
+        The `Machine` and the note's Markdown
+
+    """
+    bundle = client.get_machine_bundle(machine_name)
+    note = get_machine_template(
+        vault_path,
+        bundle.machine,
+        bundle.matrix["aggregate"],
+        bundle.matrix["maker"],
+        bundle.rating,
+        bundle.tags,
+    )
+    return bundle.machine, note
+
+
+def update_machine(
+    client: HTBClient,
+    vault_path: str,
+    machine_name: str,
+    manifest: Optional[Manifest] = None,
+) -> UpdateResult:
+    """Create or refresh the note of one machine
+
+    The machine folder and writeup templates are only created if the folder doesn't exist
+    yet; the info note is only rewritten if its content changed.
+
+    Args:
+        client: The API client
+        vault_path: The vault root
+        machine_name: The name or ID of the machine
+        manifest: The vault's `Manifest`. If not given, the manifest is loaded and saved
+                  for this one update.
+
+    Returns:
+        What was written
+
+    Raises:
+        NotFoundException: If there is no such machine
+
+    """
+    start = time.perf_counter()
+    own_manifest = manifest is None
+    if own_manifest:
+        manifest = Manifest(vault_path)
+    machine, note = render_machine_note(client, vault_path, machine_name)
+    folder = os.path.join(vault_path, MACHINES_FOLDER, machine.name)
+    created = not os.path.exists(folder)
+    if created:
+        os.makedirs(os.path.join(folder, "assets"))
+        for file_name, template in TEMPLATES:
+            manifest.write(os.path.join(folder, file_name), template())
+    path = os.path.join(folder, machine.name + ".md")
+    written = manifest.write(path, note)
+    if own_manifest:
+        manifest.save()
+    return UpdateResult(
+        machine_name, path, created, written, seconds=time.perf_counter() - start
+    )
+
+
+def bulk_update(
+    client: HTBClient,
+    vault_path: str,
+    names: Optional[List[str]] = None,
+    on_result: Optional[Callable[[UpdateResult], None]] = None,
+    jobs: int = 1,
+    manifest: Optional[Manifest] = None,
+    budget: Optional[Budget] = None,
+) -> List[UpdateResult]:
+    """Refresh many machine notes with one client
+
+    Every machine shares the client's connections, caches and rate limiter, so running
+    several jobs never exceeds the request budget a single one would have. A machine that
+    fails to update is recorded and the rest carry on.
+
+    Args:
+        client: The API client
+        vault_path: The vault root
+        names: The machines to refresh; by default every folder under ``Machines/``
+        on_result: Called with each result, in the order of `names`, as soon as it and
+                   every result before it are known
+        jobs: The number of machines refreshed at once
+        manifest: The vault's `Manifest`. If not given, it is loaded and saved once
+                  every machine is done.
+        budget: Stop starting machines once this `Budget` has no room for another. It
+                should already be started.
+
+    Returns:
+        One result per machine started, in order. Machines the budget left no room for
+        come after them in `names` and have no result.
+
+    If interrupted, the machines already running are finished and passed to `on_result`
+    before the exception propagates; the queued ones are never started.
+
+    """
+    if names is None:
+        names = machine_folders(vault_path)
+    own_manifest = manifest is None
+    if own_manifest:
+        manifest = Manifest(vault_path)
+
+    def update(name: str) -> UpdateResult:
+        start = time.perf_counter()
+        try:
+            return update_machine(client, vault_path, name, manifest)
+        except Exception as e:
+            return UpdateResult(name, error=e, seconds=time.perf_counter() - start)
+
+    jobs = max(1, jobs)
+    # Without a budget every machine is queued at once; with one, only as many as run at
+    # once, so the budget is checked against what the latest machines cost
+    window = jobs if budget is not None else len(names)
+    queue = iter(names)
+    pending = deque()
+    results = []
+    with ThreadPoolExecutor(jobs, thread_name_prefix="htnotes") as pool:
+        try:
+            while True:
+                while len(pending) < window and (
+                    budget is None or budget.allows(len(pending), len(results))
+                ):
+                    name = next(queue, None)
+                    if name is None:
+                        break
+                    pending.append(pool.submit(update, name))
+                if not pending:
+                    break
+                # Only dequeued once done, so an interrupt while waiting still reports it
+                result = pending[0].result()
+                pending.popleft()
+                results.append(result)
+                if on_result is not None:
+                    on_result(result)
+        except BaseException:
+            # Don't start the queued machines when interrupted, but report the ones that
+            # were already running: their notes are written, so a resume can skip them
+            pool.shutdown(wait=True, cancel_futures=True)
+            for future in pending:
+                if future.cancelled() or future.exception() is not None:
+                    continue
+                result = future.result()
+                results.append(result)
+                if on_result is not None:
+                    on_result(result)
+            if own_manifest:
+                manifest.save()
+            raise
+    if own_manifest:
+        manifest.save()
+    return results
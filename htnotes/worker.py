@@ -0,0 +1,125 @@
+"""
+A long-lived process that runs `htb_api.py` commands with an already warm client.
+
+Starting Python, importing `requests` and `dateutil` and opening a connection to the API
+take longer than refreshing a cached note. The worker pays for them once and then listens
+on a Unix socket; ``htb_send.py`` forwards each button's command line to it and prints the
+output, or runs ``htb_api.py`` itself when no worker is listening.
+
+Each request is one JSON line, ``{"argv": [...], "cwd": "..."}``. The worker answers with
+JSON lines of output, ``{"out": "..."}``, and a final ``{"exit": <status>}``. Commands run
+one at a time, since their output is captured by redirecting ``sys.stdout``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from typing import Callable, List, Optional
+
+# Seconds without a request before the worker exits
+IDLE_TIMEOUT = 30 * 60
+
+
+def socket_path() -> str:
+    """Where the worker listens: ``$HTNOTES_SOCKET``, else a per-user runtime directory
+
+    ``htb_send.py`` works the same path out on its own, so keep the two in step.
+    """
+    if os.environ.get("HTNOTES_SOCKET"):
+        return os.environ["HTNOTES_SOCKET"]
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or os.path.join(
+        os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "htnotes"
+    )
+    return os.path.join(runtime_dir, "htnotes.sock")
+
+
+class _OutputStream:
+    """A text stream sending everything written to it as ``{"out": ...}`` lines"""
+
+    def __init__(self, wfile):
+        self._wfile = wfile
+
+    def write(self, text: str) -> int:
+        if text:
+            self._wfile.write(json.dumps({"out": text}) + "\n")
+            self._wfile.flush()
+        return len(text)
+
+    def flush(self):
+        self._wfile.flush()
+
+
+def _handle_connection(conn: socket.socket, handle: Callable[[List[str], str], int]):
+    with conn.makefile("r") as rfile, conn.makefile("w") as wfile:
+        try:
+            request = json.loads(rfile.readline())
+        except ValueError:
+            return
+        stream = _OutputStream(wfile)
+        with redirect_stdout(stream), redirect_stderr(stream):
+            try:
+                status = handle(request["argv"], request.get("cwd") or os.getcwd())
+            except SystemExit as e:
+                # argparse exits on bad arguments and --help
+                status = e.code if isinstance(e.code, int) else 1
+            except Exception:
+                traceback.print_exc()
+                status = 1
+        wfile.write(json.dumps({"exit": status or 0}) + "\n")
+        wfile.flush()
+
+
+def serve(
+    handle: Callable[[List[str], str], int],
+    path: Optional[str] = None,
+    idle_timeout: float = IDLE_TIMEOUT,
+):
+    """Answer commands on a Unix socket until none arrives for `idle_timeout` seconds
+
+    Args:
+        handle: Runs a command line, given its arguments and working directory, and
+                returns the exit status
+        path: The socket to listen on; by default `socket_path()`
+        idle_timeout: Seconds without a request before returning
+
+    Raises:
+        RuntimeError: If another worker is already listening on the socket
+
+    """
+    path = path or socket_path()
+    if os.path.exists(path):
+        probe = socket.socket(socket.AF_UNIX)
+        try:
+            probe.connect(path)
+        except OSError:
+            os.unlink(path)  # Left behind by a worker that died
+        else:
+            raise RuntimeError(f"A worker is already listening on {path}")
+        finally:
+            probe.close()
+    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+
+    server = socket.socket(socket.AF_UNIX)
+    try:
+        server.bind(path)
+        os.chmod(path, 0o600)
+        server.listen()
+        server.settimeout(idle_timeout)
+        while True:
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                break
+            conn.settimeout(None)
+            with conn:
+                try:
+                    _handle_connection(conn, handle)
+                except OSError:
+                    pass  # The sender went away mid-command
+    finally:
+        server.close()
+        os.unlink(path)
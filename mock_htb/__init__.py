@@ -0,0 +1,16 @@
+"""
+A local stand-in for the Hack The Box v4 API, for load-testing and benchmarking without
+touching the real platform.
+
+Examples:
+    Serving 10k machines with 50ms of latency and pointing a client at it::
+
+        from mock_htb import Catalog, Faults, create_app, serve
+
+        server, api_base = serve(create_app(Catalog(machines=10000), Faults(latency=0.05)))
+        client = HTBClient(app_token="mock", api_base=api_base)
+
+"""
+
+from .catalog import Catalog
+from .server import Faults, create_app, serve
@@ -0,0 +1,56 @@
+import argparse
+import time
+
+from .catalog import Catalog
+from .server import Faults, create_app, serve
+
+parser = argparse.ArgumentParser(
+    prog="python -m mock_htb", description="Serve a mock Hack The Box v4 API"
+)
+parser.add_argument("--host", default="127.0.0.1")
+parser.add_argument("--port", type=int, default=5000)
+parser.add_argument("--machines", type=int, default=100, help="Machines in the catalog")
+parser.add_argument(
+    "--challenges", type=int, default=50, help="Challenges in the catalog"
+)
+parser.add_argument(
+    "--seed", type=int, default=0, help="Seed for the catalog and faults"
+)
+parser.add_argument(
+    "--latency", type=float, default=0.0, help="Seconds added to every response"
+)
+parser.add_argument(
+    "--jitter", type=float, default=0.0, help="Up to this many extra seconds, at random"
+)
+parser.add_argument(
+    "--rate-limit", type=float, default=0.0, help="Requests/sec before answering 429"
+)
+parser.add_argument(
+    "--retry-after", type=float, default=1.0, help="Retry-After sent with a 429"
+)
+parser.add_argument(
+    "--error-rate",
+    type=float,
+    default=0.0,
+    help="Fraction of requests answered with a 500",
+)
+args = parser.parse_args()
+
+catalog = Catalog(machines=args.machines, challenges=args.challenges, seed=args.seed)
+faults = Faults(
+    latency=args.latency,
+    jitter=args.jitter,
+    rate_limit=args.rate_limit,
+    retry_after=args.retry_after,
+    error_rate=args.error_rate,
+    seed=args.seed,
+)
+server, api_base = serve(create_app(catalog, faults), args.host, args.port, quiet=False)
+print(
+    f"Serving {args.machines} machines and {args.challenges} challenges at {api_base}"
+)
+try:
+    while True:
+        time.sleep(3600)
+except KeyboardInterrupt:
+    server.shutdown()
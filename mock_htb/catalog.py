@@ -0,0 +1,318 @@
+"""
+Synthetic Hack The Box catalogs for the mock API.
+
+Everything is generated from a seed, so the same arguments always produce the same catalog.
+Records use the field names of the v4 API, so they can be fed straight to `Machine`,
+`Challenge` and `User`.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+OPERATING_SYSTEMS = ("Linux", "Windows", "FreeBSD", "OpenBSD", "Android", "Solaris")
+DIFFICULTIES = ("Easy", "Medium", "Hard", "Insane")
+POINTS = {"Easy": 20, "Medium": 30, "Hard": 40, "Insane": 50}
+CHALLENGE_CATEGORIES = (
+    "Web",
+    "Pwn",
+    "Crypto",
+    "Reversing",
+    "Forensics",
+    "Misc",
+    "Mobile",
+    "OSINT",
+    "Hardware",
+)
+TAGS = (
+    "Web",
+    "Active Directory",
+    "Enumeration",
+    "SQL Injection",
+    "Privilege Escalation",
+    "Kerberos",
+    "Command Injection",
+    "Deserialization",
+    "Buffer Overflow",
+    "Reverse Engineering",
+    "Cryptography",
+    "Sudo Exploitation",
+    "Docker",
+    "SSRF",
+    "File Upload",
+    "Password Cracking",
+)
+SYLLABLES = (
+    "ar", "bo", "ca", "de", "el", "fa", "gi", "ho", "in", "ja", "ke", "lo", "ma", "ne",
+    "or", "pi", "qu", "ro", "sa", "te", "ul", "va", "wo", "xe", "yu", "zo",
+)  # fmt: skip
+RANKS = (
+    "Noob",
+    "Script Kiddie",
+    "Hacker",
+    "Pro Hacker",
+    "Elite Hacker",
+    "Guru",
+    "Omniscient",
+)
+EPOCH = datetime(2017, 3, 1)
+# Machine profile fields the list endpoints leave out
+DETAIL_ONLY = ("feedbackForChart", "userBlood", "rootBlood")
+
+
+def _timestamp(date: datetime) -> str:
+    return date.strftime("%Y-%m-%dT%H:%M:%S.000000Z")
+
+
+def _delta(rng: random.Random) -> str:
+    return f"{rng.randint(0, 3)}D {rng.randint(0, 23)}H {rng.randint(1, 59)}m {rng.randint(0, 59)}S"
+
+
+def _name(rng: random.Random, taken: set) -> str:
+    while True:
+        name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).title()
+        if name in taken:
+            name += str(len(taken))
+        if name not in taken:
+            taken.add(name)
+            return name
+
+
+def _scores(rng: random.Random) -> dict:
+    return {k: rng.randint(1, 10) for k in ("enum", "real", "cve", "custom", "ctf")}
+
+
+class Catalog:
+    """A generated set of machines, challenges, users and teams
+
+    Attributes:
+        machines: Machine profiles, keyed by ID
+        machine_names: Machine IDs keyed by lower-cased name
+        tags: Machine tags, keyed by machine ID
+        matrices: Machine maker/user matrices, keyed by machine ID
+        difficulties: Machine difficulty rating graphs, keyed by machine ID
+        challenges: Challenge infos, keyed by ID
+        users: User basic profiles, keyed by ID
+        teams: Team infos, keyed by ID
+        servers: VPN servers, keyed by ID
+        me: The ID of the authenticated user
+
+    """
+
+    def __init__(
+        self, machines: int = 100, challenges: int = 50, users: int = 0, seed: int = 0
+    ):
+        """Generate a catalog
+
+        Args:
+            machines: The number of machines
+            challenges: The number of challenges
+            users: The number of users; by default one per ten machines, with at least 100
+            seed: The random seed
+
+        """
+        rng = random.Random(seed)
+        users = users or max(100, machines // 10)
+        self.users = {}
+        self.teams = {}
+        self.machines = {}
+        self.machine_names = {}
+        self.tags = {}
+        self.matrices = {}
+        self.difficulties = {}
+        self.challenges = {}
+        self.servers = {}
+        self._summaries = {}
+
+        for team_id in range(1, max(10, users // 20) + 1):
+            self.teams[team_id] = {
+                "id": team_id,
+                "name": f"Team{team_id}",
+                "points": rng.randint(0, 5000),
+                "motto": "",
+                "description": "",
+                "country_name": "Spain",
+                "avatar_url": "",
+                "cover_image_url": "",
+                "twitter": None,
+                "facebook": None,
+                "discord": None,
+                "public": True,
+                "can_delete_avatar": False,
+                "captain": {"id": 1},
+                "is_respected": False,
+                "join_request_sent": False,
+            }
+
+        user_names = set()
+        for user_id in range(1, users + 1):
+            rank = rng.randrange(len(RANKS))
+            self.users[user_id] = {
+                "id": user_id,
+                "name": _name(rng, user_names).lower(),
+                "avatar": f"/storage/avatars/{user_id}.png",
+                "ranking": user_id,
+                "points": max(0, 2000 - user_id * 3 + rng.randint(0, 50)),
+                "user_owns": rng.randint(0, 400),
+                "system_owns": rng.randint(0, 400),
+                "user_bloods": rng.randint(0, 20),
+                "system_bloods": rng.randint(0, 20),
+                "rank": RANKS[rank],
+                "respects": rng.randint(0, 500),
+                "university": None,
+                "university_name": None,
+                "description": None,
+                "github": None,
+                "linkedin": None,
+                "twitter": None,
+                "website": None,
+                "isRespected": False,
+                "isFollowed": False,
+                "current_rank_progress": rng.randint(0, 100),
+                "next_rank": RANKS[min(rank + 1, len(RANKS) - 1)],
+                "next_rank_points": rng.randint(0, 100),
+                "rank_ownership": f"{rng.uniform(0, 100):.2f}",
+                "rank_requirement": rng.randint(0, 100),
+                "country_name": "Spain",
+                "team": {"id": rng.randint(1, len(self.teams)), "name": "Team"},
+                "public": 1,
+            }
+        self.me = 1
+
+        active = max(1, min(30, machines // 5))
+        machine_names = set()
+        for machine_id in range(1, machines + 1):
+            name = _name(rng, machine_names)
+            difficulty = rng.choice(DIFFICULTIES)
+            released = EPOCH + timedelta(days=machine_id * 2000 // max(machines, 1))
+            is_active = machine_id > machines - active
+            user_owned = rng.random() < 0.3
+            root_owned = user_owned and rng.random() < 0.7
+            maker2 = rng.randint(1, users) if rng.random() < 0.3 else None
+            self.machines[machine_id] = {
+                "id": machine_id,
+                "name": name,
+                "os": rng.choice(OPERATING_SYSTEMS),
+                "points": POINTS[difficulty] if is_active else 0,
+                "release": _timestamp(released),
+                "user_owns_count": rng.randint(0, 20000),
+                "root_owns_count": rng.randint(0, 15000),
+                "authUserInUserOwns": user_owned,
+                "authUserInRootOwns": root_owned,
+                "authUserHasReviewed": False,
+                "authUserFirstUserTime": _delta(rng) if user_owned else None,
+                "authUserFirstRootTime": _delta(rng) if root_owned else None,
+                "stars": f"{rng.uniform(2.5, 5):.1f}",
+                "avatar": f"/storage/avatars/{machine_id:032x}.png",
+                "difficultyText": difficulty,
+                "difficulty": rng.randint(10, 100),
+                "free": is_active and rng.random() < 0.5,
+                "maker": {"id": rng.randint(1, users)},
+                "maker2": {"id": maker2} if maker2 else None,
+                "ip": f"10.10.{10 + machine_id // 250 % 240}.{machine_id % 250 + 2}",
+                "active": int(is_active),
+                "retired": int(not is_active),
+                "feedbackForChart": {
+                    "counterCake": rng.randint(0, 500),
+                    "counterVeryEasy": rng.randint(0, 500),
+                    "counterEasy": rng.randint(0, 500),
+                    "counterTooEasy": rng.randint(0, 500),
+                    "counterMedium": rng.randint(0, 500),
+                    "counterBitHard": rng.randint(0, 500),
+                    "counterHard": rng.randint(0, 500),
+                    "counterTooHard": rng.randint(0, 500),
+                    "counterExHard": rng.randint(0, 500),
+                    "counterBrainFuck": rng.randint(0, 500),
+                },
+                "userBlood": {
+                    "user": {"id": rng.randint(1, users)},
+                    "created_at": _timestamp(released + timedelta(minutes=30)),
+                    "blood_difference": _delta(rng),
+                },
+                "rootBlood": {
+                    "user": {"id": rng.randint(1, users)},
+                    "created_at": _timestamp(released + timedelta(hours=1)),
+                    "blood_difference": _delta(rng),
+                },
+            }
+            self.machine_names[name.lower()] = machine_id
+            self.tags[machine_id] = [
+                {"id": TAGS.index(tag) + 1, "name": tag, "category": "Area of Interest"}
+                for tag in rng.sample(TAGS, rng.randint(1, 5))
+            ]
+            self.matrices[machine_id] = {
+                "maker": _scores(rng),
+                "aggregate": _scores(rng),
+                "user": _scores(rng),
+            }
+            self.difficulties[machine_id] = {
+                str(level): {"user": rng.randint(0, 300), "root": rng.randint(0, 300)}
+                for level in range(1, 11)
+            }
+
+        challenge_names = set()
+        for challenge_id in range(1, challenges + 1):
+            difficulty = rng.choice(DIFFICULTIES)
+            docker = rng.random() < 0.5
+            creator2 = rng.randint(1, users) if rng.random() < 0.2 else None
+            self.challenges[challenge_id] = {
+                "id": challenge_id,
+                "name": _name(rng, challenge_names),
+                "retired": int(rng.random() < 0.8),
+                "points": str(POINTS[difficulty]),
+                "difficulty": difficulty,
+                "difficulty_chart": {"counterCake": rng.randint(0, 100)},
+                "solves": rng.randint(0, 10000),
+                "authUserSolve": rng.random() < 0.2,
+                "likes": rng.randint(0, 1000),
+                "dislikes": rng.randint(0, 100),
+                "release_date": _timestamp(
+                    EPOCH + timedelta(days=challenge_id * 2000 // max(challenges, 1))
+                ),
+                "description": "Find the flag.",
+                "category_name": rng.choice(CHALLENGE_CATEGORIES),
+                "creator_id": rng.randint(1, users),
+                "creator2_id": creator2,
+                "download": rng.random() < 0.8,
+                "docker": docker,
+                "docker_ip": None,
+                "docker_port": None,
+            }
+
+        for server_id, (location, tier) in enumerate(
+            [
+                ("EU", "Free"),
+                ("EU", "VIP"),
+                ("US", "Free"),
+                ("US", "VIP"),
+                ("AU", "VIP"),
+            ],
+            start=1,
+        ):
+            self.servers[server_id] = {
+                "id": server_id,
+                "friendly_name": f"{location} {tier} {server_id}",
+                "current_clients": rng.randint(0, 200),
+                "location": location,
+                "tier": tier,
+            }
+
+    def machine(self, machine_id) -> dict:
+        """Find a machine profile by ID or name
+
+        Raises:
+            KeyError: If there is no such machine
+
+        """
+        if isinstance(machine_id, str) and not machine_id.isdigit():
+            machine_id = self.machine_names[machine_id.lower()]
+        return self.machines[int(machine_id)]
+
+    def machine_summaries(self, retired: bool) -> list:
+        """The `machine/list` (or `machine/list/retired`) view of the catalog"""
+        if retired not in self._summaries:
+            self._summaries[retired] = [
+                {k: v for k, v in m.items() if k not in DETAIL_ONLY}
+                for m in self.machines.values()
+                if bool(m["retired"]) == retired
+            ]
+        return self._summaries[retired]
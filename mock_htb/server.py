@@ -0,0 +1,403 @@
+"""
+A Flask stand-in for the Hack The Box v4 API, serving a generated `Catalog`.
+
+Only the endpoints used by `hackthebox` are implemented. Latency, rate limiting and server
+errors can be injected to load-test the client, and every response carries an `ETag` so
+revalidation can be exercised too.
+"""
+
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import Counter
+
+from flask import Flask, Response, abort, request
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from .catalog import Catalog
+
+API_PREFIX = "/api/v4/"
+
+
+class KeepAliveRequestHandler(WSGIRequestHandler):
+    """The werkzeug handler speaks HTTP/1.0 by default, which closes every connection"""
+
+    protocol_version = "HTTP/1.1"
+
+
+class QuietRequestHandler(KeepAliveRequestHandler):
+    """Keep-alive handler that doesn't log every request"""
+
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+class Faults:
+    """The misbehaviour injected into responses
+
+    Attributes:
+        latency: Seconds added to every response
+        jitter: Up to this many extra seconds added at random
+        rate_limit: Requests per second allowed before answering 429; 0 disables it
+        retry_after: The `Retry-After` sent with a 429
+        error_rate: The fraction of requests answered with a 500
+
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        rate_limit: float = 0.0,
+        retry_after: float = 1.0,
+        error_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._tokens = rate_limit
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def delay(self) -> float:
+        with self._lock:
+            return self.latency + self._rng.uniform(0, self.jitter)
+
+    def limited(self) -> bool:
+        """Take a token from the server-side bucket; True if there was none"""
+        if not self.rate_limit:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.rate_limit, self._tokens + (now - self._updated) * self.rate_limit
+            )
+            self._updated = now
+            if self._tokens < 1:
+                return True
+            self._tokens -= 1
+            return False
+
+    def failed(self) -> bool:
+        with self._lock:
+            return self._rng.random() < self.error_rate
+
+
+def create_app(catalog: Catalog, faults: Faults = None) -> Flask:
+    """Build the mock API application
+
+    Args:
+        catalog: The data to serve
+        faults: The latency, rate limiting and errors to inject
+
+    Returns:
+        The Flask app. ``app.config["REQUEST_COUNTS"]`` counts requests per route.
+
+    """
+    faults = faults or Faults()
+    app = Flask("mock_htb")
+    counts = app.config["REQUEST_COUNTS"] = Counter()
+    counts_lock = threading.Lock()
+
+    def reply(payload, status=200):
+        body = json.dumps(payload, separators=(",", ":"))
+        etag = '"' + hashlib.md5(body.encode()).hexdigest() + '"'
+        if status == 200 and request.headers.get("If-None-Match") == etag:
+            return Response(status=304, headers={"ETag": etag})
+        return Response(
+            body, status=status, mimetype="application/json", headers={"ETag": etag}
+        )
+
+    def lookup(table, key):
+        try:
+            return table[int(key)]
+        except (KeyError, ValueError):
+            abort(404)
+
+    @app.before_request
+    def inject_faults():
+        if not request.path.startswith(API_PREFIX):
+            return None
+        with counts_lock:
+            counts[request.url_rule.rule if request.url_rule else request.path] += 1
+            counts["total"] += 1
+        delay = faults.delay()
+        if delay:
+            time.sleep(delay)
+        if faults.limited():
+            response = reply({"message": "Too Many Attempts."}, 429)
+            response.headers["Retry-After"] = str(faults.retry_after)
+            return response
+        if faults.failed():
+            return reply({"message": "Server Error"}, 500)
+        if not request.path.startswith(API_PREFIX + "login"):
+            if not request.headers.get("Authorization", "").startswith("Bearer "):
+                return reply({"message": "Unauthenticated."}, 401)
+        return None
+
+    @app.route("/_mock/stats")
+    def stats():
+        with counts_lock:
+            return reply(dict(counts))
+
+    @app.route("/_mock/reset", methods=["POST"])
+    def reset():
+        with counts_lock:
+            counts.clear()
+        return reply({"success": True})
+
+    @app.route(API_PREFIX + "user/info")
+    def user_info():
+        return reply({"info": {"id": catalog.me}})
+
+    @app.route(API_PREFIX + "machine/profile/<machine_id>")
+    def machine_profile(machine_id):
+        try:
+            return reply({"info": catalog.machine(machine_id)})
+        except (KeyError, ValueError):
+            abort(404)
+
+    @app.route(API_PREFIX + "machine/list")
+    def machine_list():
+        return reply({"info": catalog.machine_summaries(retired=False)})
+
+    @app.route(API_PREFIX + "machine/list/retired")
+    def machine_list_retired():
+        return reply({"info": catalog.machine_summaries(retired=True)})
+
+    @app.route(API_PREFIX + "machine/tags/<machine_id>")
+    def machine_tags(machine_id):
+        return reply({"info": lookup(catalog.tags, machine_id)})
+
+    @app.route(API_PREFIX + "machine/graph/matrix/<machine_id>")
+    def machine_matrix(machine_id):
+        return reply({"info": lookup(catalog.matrices, machine_id)})
+
+    @app.route(API_PREFIX + "machine/graph/owns/difficulty/<machine_id>")
+    def machine_difficulty(machine_id):
+        return reply({"info": lookup(catalog.difficulties, machine_id)})
+
+    @app.route(API_PREFIX + "machine/active")
+    def machine_active():
+        return reply({"info": None})
+
+    @app.route(API_PREFIX + "release_arena/active")
+    def release_arena_active():
+        return reply({"info": None})
+
+    @app.route(API_PREFIX + "home/user/todo")
+    def todo():
+        return reply({"data": {"machines": catalog.machine_summaries(False)[:10]}})
+
+    @app.route(API_PREFIX + "challenge/info/<challenge_id>")
+    def challenge_info(challenge_id):
+        if not challenge_id.isdigit():
+            for challenge in catalog.challenges.values():
+                if challenge["name"].lower() == challenge_id.lower():
+                    return reply({"challenge": challenge})
+            abort(404)
+        return reply({"challenge": lookup(catalog.challenges, challenge_id)})
+
+    @app.route(API_PREFIX + "challenge/list")
+    def challenge_list():
+        challenges = [c for c in catalog.challenges.values() if not c["retired"]]
+        return reply({"challenges": challenges})
+
+    @app.route(API_PREFIX + "challenge/list/retired")
+    def challenge_list_retired():
+        challenges = [c for c in catalog.challenges.values() if c["retired"]]
+        return reply({"challenges": challenges})
+
+    @app.route(API_PREFIX + "challenge/download/<challenge_id>")
+    def challenge_download(challenge_id):
+        lookup(catalog.challenges, challenge_id)
+        return Response(b"PK\x05\x06" + bytes(18), mimetype="application/zip")
+
+    @app.route(API_PREFIX + "user/profile/basic/<user_id>")
+    def user_profile(user_id):
+        return reply({"profile": lookup(catalog.users, user_id)})
+
+    @app.route(API_PREFIX + "user/profile/activity/<user_id>")
+    def user_activity(user_id):
+        lookup(catalog.users, user_id)
+        activity = [
+            {
+                "date": "2022-11-12T10:00:00.000000Z",
+                "first_blood": False,
+                "id": machine["id"],
+                "name": machine["name"],
+                "object_type": "machine",
+                "type": "user",
+            }
+            for machine in list(catalog.machines.values())[:5]
+        ]
+        return reply({"profile": {"activity": activity}})
+
+    @app.route(API_PREFIX + "user/profile/content/<user_id>")
+    def user_content(user_id):
+        user_id = lookup(catalog.users, user_id)["id"]
+        machines = [
+            {"id": m["id"]}
+            for m in catalog.machines.values()
+            if m["maker"]["id"] == user_id
+        ]
+        challenges = [
+            {"id": c["id"]}
+            for c in catalog.challenges.values()
+            if c["creator_id"] == user_id
+        ]
+        return reply(
+            {"profile": {"content": {"machines": machines, "challenges": challenges}}}
+        )
+
+    @app.route(API_PREFIX + "team/info/<team_id>")
+    def team_info(team_id):
+        return reply(lookup(catalog.teams, team_id))
+
+    @app.route(API_PREFIX + "team/stats/owns/<team_id>")
+    def team_stats(team_id):
+        return reply({"rank": lookup(catalog.teams, team_id)["id"]})
+
+    @app.route(API_PREFIX + "search/fetch")
+    def search():
+        term = request.args.get("query", "").lower()
+
+        def matching(items, limit=10):
+            return [
+                {"id": item["id"], "value": item["name"]}
+                for item in items
+                if term in item["name"].lower()
+            ][:limit]
+
+        return reply(
+            {
+                "machines": matching(catalog.machines.values()),
+                "challenges": matching(catalog.challenges.values()),
+                "users": matching(catalog.users.values()),
+                "teams": matching(catalog.teams.values()),
+            }
+        )
+
+    @app.route(API_PREFIX + "rankings/users")
+    def rankings_users():
+        users = sorted(catalog.users.values(), key=lambda u: u["ranking"])[:100]
+        return reply(
+            {
+                "data": [
+                    {
+                        "id": u["id"],
+                        "name": u["name"],
+                        "rank": u["ranking"],
+                        "points": u["points"],
+                        "user_owns": u["user_owns"],
+                        "root_owns": u["system_owns"],
+                        "user_bloods_count": u["user_bloods"],
+                        "root_bloods_count": u["system_bloods"],
+                        "rank_text": u["rank"],
+                    }
+                    for u in users
+                ]
+            }
+        )
+
+    @app.route(API_PREFIX + "rankings/teams")
+    def rankings_teams():
+        teams = list(catalog.teams.values())[:100]
+        return reply({"data": [{"id": t["id"], "name": t["name"]} for t in teams]})
+
+    def group_ranking(name_key, extra):
+        return [
+            {
+                "rank": rank,
+                name_key: f"{name_key.title()} {rank}",
+                "name": f"{name_key.title()} {rank}",
+                "points": 10000 - rank,
+                "user_owns": rank,
+                "root_owns": rank,
+                "challenge_owns": rank,
+                "user_bloods": rank,
+                "root_bloods": rank,
+                "fortress": rank,
+                "endgame": rank,
+                extra: rank * 10,
+            }
+            for rank in range(1, 101)
+        ]
+
+    @app.route(API_PREFIX + "rankings/countries")
+    def rankings_countries():
+        return reply({"data": group_ranking("country", "members")})
+
+    @app.route(API_PREFIX + "rankings/universities")
+    def rankings_universities():
+        return reply({"data": group_ranking("university", "students")})
+
+    @app.route(API_PREFIX + "connections")
+    def connections():
+        active = catalog.machine_summaries(retired=False)
+        return reply(
+            {
+                "status": True,
+                "data": {
+                    "lab": {
+                        "can_access": True,
+                        "assigned_server": catalog.servers[1],
+                    },
+                    "release_arena": {
+                        "can_access": True,
+                        "machine": {"id": active[-1]["id"]} if active else None,
+                    },
+                },
+            }
+        )
+
+    @app.route(API_PREFIX + "connections/servers")
+    def connection_servers():
+        options = {}
+        for server in catalog.servers.values():
+            group = f"{server['location']} - {server['tier']}"
+            options.setdefault(server["location"], {}).setdefault(
+                group, {"servers": {}}
+            )["servers"][str(server["id"])] = server
+        return reply(
+            {
+                "status": True,
+                "data": {"assigned": catalog.servers[1], "options": options},
+            }
+        )
+
+    @app.route(API_PREFIX + "access/ovpnfile/<server_id>/<udp>")
+    @app.route(API_PREFIX + "access/ovpnfile/<server_id>/<udp>/<tcp>")
+    def ovpn_file(server_id, udp, tcp=None):
+        server = lookup(catalog.servers, server_id)
+        config = (
+            f"client\nremote {server['friendly_name'].replace(' ', '-')}.mock 1337\n"
+        )
+        return Response(config.encode(), mimetype="application/octet-stream")
+
+    return app
+
+
+def serve(app: Flask, host: str = "127.0.0.1", port: int = 0, quiet: bool = True):
+    """Serve an app on a background thread
+
+    Args:
+        app: The app from `create_app`
+        host: The address to listen on
+        port: The port to listen on; 0 picks a free one
+        quiet: Don't log each request
+
+    Returns:
+        The running werkzeug server and the API base URL to give `HTBClient`
+
+    """
+    handler = QuietRequestHandler if quiet else KeepAliveRequestHandler
+    server = make_server(host, port, app, threaded=True, request_handler=handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_port}{API_PREFIX}"
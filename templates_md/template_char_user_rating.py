@@ -75,6 +75,8 @@ meta:
 
 
 def get_template_char_user_rating(user_rating):
+    if not user_rating:  # The rating couldn't be fetched
+        return ""
     return f'''
 ```chartsview
 #-----------------#